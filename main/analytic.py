@@ -0,0 +1,29 @@
+import time
+
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+
+
+def analytic(tables, table_ind, *, trace=None):
+    """
+    Точное решение задачи наименьших квадратов (без итераций).
+    Модель линейна по a и b, поэтому оптимум находится из нормальных уравнений.
+    trace — необязательный Trace (одна запись).
+    """
+    start_time = time.time()
+
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
+    if not l_points:
+        return empty_result(trace)
+
+    a, b = problem.optimum()
+    count = 1
+    if trace is not None:
+        trace.record(problem.min_loss, a, b)
+
+    result = make_result(problem, a, b, count, start_time, trace)
+
+    print(f"Analytic completed in {result.exec_time:.6f} seconds with {count} iterations")
+
+    return result
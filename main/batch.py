@@ -0,0 +1,89 @@
+import contextlib
+import itertools
+import multiprocessing
+import time
+
+from .fit_problem import FitProblem
+from .solvers import build_result, get_solver
+from .trace import Trace
+
+
+def iter_table_chunks(queryset, chunk_size):
+    """Таблицы из БД порциями по chunk_size (потоково, через iterator())."""
+    tables = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(tables, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_problems(tables):
+    """FitProblem для порции таблиц: точки всех таблиц читаются одним запросом."""
+    from .models import Table
+
+    points = {table.id: ([], []) for table in tables}
+    rows = (Table.points.through.objects
+            .filter(table_id__in=list(points))
+            .order_by('table_id', 'id')
+            .values_list('table_id', 'point__x_value', 'point__y_value'))
+    for table_id, x, y in rows:
+        points[table_id][0].append(x)
+        points[table_id][1].append(y)
+    return {table.id: FitProblem(*points[table.id], table.temperature) for table in tables}
+
+
+def fit_job(job):
+    """Один расчет (table_id, ключ алгоритма, FitProblem) в процессе пула."""
+    table_id, key, problem = job
+    return table_id, key, get_solver(key).run([problem], 0, trace=Trace())
+
+
+def fit_all(queryset, algorithms, *, workers=1, chunk_size=50, user=None, progress=None):
+    """
+    Расчет всех таблиц queryset каждым алгоритмом из algorithms.
+
+    Таблицы читаются порциями по chunk_size, задания (таблица, алгоритм)
+    распределяются по пулу из workers процессов (workers=1 — в текущем процессе),
+    результаты порции сохраняются одним bulk_create.
+    Владелец результатов — user или автор таблицы; таблицы без владельца
+    и без точек пропускаются.
+    progress(fits, tables, skipped, elapsed) вызывается после каждой порции.
+    Возвращает (fits, tables, skipped, elapsed).
+    """
+    from .models import CalculationResult
+
+    specs = [get_solver(key) for key in algorithms]
+    fits = done = skipped = 0
+    start_time = time.perf_counter()
+
+    pool = multiprocessing.get_context('spawn').Pool(workers) if workers > 1 else None
+    with pool or contextlib.nullcontext():
+        for chunk in iter_table_chunks(queryset, chunk_size):
+            problems = load_problems(chunk)
+            tables = {}
+            for table in chunk:
+                owner = user or table.author
+                if owner is None or problems[table.id].n == 0:
+                    skipped += 1
+                    continue
+                tables[table.id] = (table, owner)
+
+            jobs = [(table_id, spec.key, problems[table_id]) for table_id in tables for spec in specs]
+            if pool is not None:
+                results = pool.imap_unordered(fit_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+            else:
+                results = map(fit_job, jobs)
+
+            rows = []
+            for table_id, key, result in results:
+                table, owner = tables[table_id]
+                rows.append(build_result(get_solver(key), result, user=owner, table=table))
+            CalculationResult.objects.bulk_create(rows, batch_size=500)
+
+            fits += len(rows)
+            done += len(tables)
+            if progress is not None:
+                progress(fits, done, skipped, time.perf_counter() - start_time)
+
+    return fits, done, skipped, time.perf_counter() - start_time
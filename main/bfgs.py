@@ -0,0 +1,137 @@
+import time
+import numpy as np
+
+from .fit_problem import FitProblem
+from .gradient import armijo_step
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
+
+def bfgs_minimize(loss_fn, grad_fn, x0, *, eps=1e-5, max_iters=200, alpha=0.3, beta=0.5, c2=0.9,
+                  max_extensions=10, stop=None, trace=None):
+    """
+    Квазиньютоновский метод BFGS для loss_fn(x) -> float, grad_fn(x) -> массив.
+
+    Направление p = -H g по приближению H обратного гессиана; шаг — backtracking
+    line search Армихо (gradient.armijo_step) от t = 1. Если найденный шаг
+    не удовлетворяет условию кривизны Вольфе g_new^T p >= c2 g^T p (шаг слишком
+    короткий), он удваивается, пока выполняется условие Армихо (не более
+    max_extensions раз). H обновляется при s^T y > 0 (гарантируется условием
+    Вольфе), поэтому остается положительно определенной; иначе обновление
+    пропускается. Перед первым обновлением H масштабируется: H0 = (s^T y / y^T y) I.
+    Если p не является направлением спуска или шаг не найден, H сбрасывается к I.
+    stop — необязательный StoppingCriteria, trace — необязательный Trace.
+    Возвращает (x, iterations, counts), counts — число вычислений ошибки
+    и градиента, выполненных и пропущенных обновлений, удлинений шага, сбросов.
+    """
+    if stop is None:
+        stop = StoppingCriteria()
+    counts = {'loss_evaluations': 1, 'gradient_evaluations': 1, 'updates': 0, 'skipped_updates': 0,
+              'extensions': 0, 'restarts': 0}
+
+    def counted_loss(x):
+        counts['loss_evaluations'] += 1
+        return loss_fn(x)
+
+    x = np.array(x0, dtype=float)
+    identity = np.eye(x.size)
+    inv_hess = identity
+    loss = loss_fn(x)
+    grad = np.asarray(grad_fn(x), dtype=float)
+
+    count = 0
+    while count < max_iters and not stop.expired(count):
+        grad_norm = float(np.linalg.norm(grad))
+        if grad_norm < eps or stop.converged(grad_norm=grad_norm):
+            break
+        count += 1
+
+        direction = -inv_hess @ grad
+        if grad @ direction >= 0:
+            inv_hess, direction = identity, -grad
+            counts['restarts'] += 1
+
+        step = armijo_step(counted_loss, x, loss, grad, direction, 1.0, alpha=alpha, beta=beta)
+        if step is None and inv_hess is not identity:
+            # квазиньютоновское направление не дало шага — повтор по антиградиенту
+            inv_hess, direction = identity, -grad
+            counts['restarts'] += 1
+            step = armijo_step(counted_loss, x, loss, grad, direction, 1.0, alpha=alpha, beta=beta)
+        if step is None:
+            break
+
+        t, new_x, new_loss = step
+        new_grad = np.asarray(grad_fn(new_x), dtype=float)
+        counts['gradient_evaluations'] += 1
+
+        # условие кривизны Вольфе: слишком короткий шаг удлиняется
+        slope = float(grad @ direction)
+        for _ in range(max_extensions):
+            if new_grad @ direction >= c2 * slope:
+                break
+            longer = x + 2.0 * t * direction
+            longer_loss = counted_loss(longer)
+            if longer_loss > loss + alpha * 2.0 * t * slope:
+                break
+            t, new_x, new_loss = 2.0 * t, longer, longer_loss
+            new_grad = np.asarray(grad_fn(new_x), dtype=float)
+            counts['gradient_evaluations'] += 1
+            counts['extensions'] += 1
+
+        s = new_x - x
+        y = new_grad - grad
+        sy = float(s @ y)
+        if sy > 1e-12 * float(np.linalg.norm(s) * np.linalg.norm(y)):
+            if counts['updates'] == 0:
+                inv_hess = (sy / float(y @ y)) * identity
+            rho = 1.0 / sy
+            left = identity - rho * np.outer(s, y)
+            inv_hess = left @ inv_hess @ left.T + rho * np.outer(s, s)
+            counts['updates'] += 1
+        else:
+            counts['skipped_updates'] += 1
+
+        prev_loss = loss
+        x, loss, grad = new_x, new_loss, new_grad
+        step_norm = float(np.linalg.norm(s))
+        if trace is not None:
+            trace.record(loss, x[0], x[1] if x.size > 1 else 0.0, step_norm)
+        if stop.converged(loss, prev_loss, step_norm):
+            break
+
+    return x, count, counts
+
+
+def bfgs(tables, table_ind, *, initial_params=(0.0, 0.0), eps=1e-5, max_iters=200, c2=0.9,
+         time_budget=None, stop=None, trace=None):
+    """
+    Метод BFGS для g^E = RT * x1 * x2 * (a * x1 + b * x2) (см. bfgs_minimize).
+    eps — порог нормы градиента.
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
+    Число вычислений ошибки и градиента записывается в result.stats.
+    """
+    start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
+
+    problem = FitProblem.from_table(tables[table_ind])
+    if problem.n == 0:
+        return empty_result(trace)
+
+    params, count, counts = bfgs_minimize(
+        lambda p: problem.mse(p[0], p[1]),
+        lambda p: problem.gradient(p[0], p[1]),
+        initial_params,
+        eps=eps,
+        max_iters=max_iters,
+        c2=c2,
+        stop=stop,
+        trace=trace,
+    )
+
+    result = make_result(problem, params[0], params[1], count, start_time, trace, stop.truncated)
+    result.stats = counts
+
+    print(f"BFGS completed in {result.exec_time:.3f} seconds with {count} iterations")
+
+    return result
@@ -0,0 +1,74 @@
+import numpy as np
+
+from .fit_problem import MAX_BATCH_ELEMENTS, batch_solve_normal_equations
+
+BOOTSTRAP_RESAMPLES = 1000
+
+
+def resample_indices(rng, n, resamples):
+    """Матрица индексов (resamples, n): каждая строка — выборка точек с возвращением."""
+    return rng.integers(0, n, size=(resamples, n))
+
+
+def bootstrap_fits(problem, indices, *, chunk_size=None):
+    """
+    Оценки МНК (a, b) для всех бутстреп-выборок indices формы (B, n) сразу.
+
+    Строки индексов переводятся в кратности точек (B, n), после чего суммы
+    нормальных уравнений всех выборок получаются одним матричным
+    произведением с таблицей [u^2, uv, v^2, ug, vg] (n, 5), а B систем 2x2
+    решаются векторно (batch_solve_normal_equations). Блоки по chunk_size строк
+    (по умолчанию — не больше MAX_BATCH_ELEMENTS элементов).
+    Возвращает массив (B, 2) в единицах problem; вырожденные выборки — nan.
+    """
+    indices = np.asarray(indices)
+    resamples, n = indices.shape
+    columns = np.column_stack((problem.u * problem.u, problem.u * problem.v, problem.v * problem.v,
+                               problem.u * problem.gexp, problem.v * problem.gexp))
+    if chunk_size is None:
+        chunk_size = max(1, MAX_BATCH_ELEMENTS // max(n, 1))
+
+    params = np.empty((resamples, 2))
+    for start in range(0, resamples, chunk_size):
+        block = indices[start:start + chunk_size]
+        rows = block.shape[0]
+        offsets = block + n * np.arange(rows)[:, None]
+        # кратности в float: произведение целочисленной матрицы на float идет мимо BLAS
+        counts = np.bincount(offsets.ravel(), minlength=rows * n).reshape(rows, n).astype(float)
+        sums = counts @ columns
+        a, b = batch_solve_normal_equations(*sums.T)
+        params[start:start + rows, 0] = a
+        params[start:start + rows, 1] = b
+    return params
+
+
+def bootstrap_intervals(problem, *, resamples=BOOTSTRAP_RESAMPLES, level=0.95, seed=None):
+    """
+    Бутстреп-интервалы (процентильные) для параметров a, b таблицы.
+    Точки таблицы выбираются с возвращением resamples раз, для каждой
+    выборки задача МНК решается точно (см. bootstrap_fits).
+    Возвращает {'level', 'resamples', 'valid', 'a': [low, high], 'b': [low, high],
+    'a_std', 'b_std'} в исходных единицах или None, если точек меньше трех
+    или все выборки вырождены.
+    """
+    if problem.n < 3 or not resamples:
+        return None
+    rng = np.random.default_rng(seed)
+    params = bootstrap_fits(problem, resample_indices(rng, problem.n, int(resamples)))
+    params = params[np.isfinite(params).all(axis=1)]
+    if not len(params):
+        return None
+
+    a, b = problem.to_original(params[:, 0], params[:, 1])
+    tail = (1.0 - level) / 2.0 * 100.0
+    a_low, a_high = np.percentile(a, [tail, 100.0 - tail])
+    b_low, b_high = np.percentile(b, [tail, 100.0 - tail])
+    return {
+        'level': level,
+        'resamples': int(resamples),
+        'valid': len(params),
+        'a': [float(a_low), float(a_high)],
+        'b': [float(b_low), float(b_high)],
+        'a_std': float(np.std(a, ddof=1)) if len(params) > 1 else 0.0,
+        'b_std': float(np.std(b, ddof=1)) if len(params) > 1 else 0.0,
+    }
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import fit_cache
+from .bootstrap import bootstrap_intervals
+from .fit_problem import FitProblem
+from .solvers import get_solver, run_solver, save_result
+from .trace import Trace
+
+# пять исходных методов приложения
+COMPARE_ALGORITHMS = ('gauss', 'gauss_step', 'gradient', 'gradient_step', 'otzhig')
+
+# относительный зазор до оптимума МНК, при котором расчет считается точным
+OPTIMALITY_GAP_TOL = 1e-6
+
+_pool = None
+
+
+def get_pool():
+    """
+    Общий пул процессов для сравнения методов (создается один раз на процесс).
+    Используется spawn: fork из многопоточного gunicorn-воркера небезопасен.
+    """
+    global _pool
+    if _pool is None:
+        workers = min(len(COMPARE_ALGORITHMS), os.cpu_count() or 1)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def reset_pool():
+    """
+    Сброс общего пула (например, после гибели процесса-обработчика, когда пул
+    выбрасывает BrokenProcessPool); следующий get_pool создаст новый.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run(key, problem, time_budget=None):
+    """
+    Запуск одного алгоритма в процессе пула (без обращений к БД) через
+    run_solver с теми же параметрами, что и одиночный расчет; кэш
+    проверяется в compare_all.
+    """
+    return run_solver(get_solver(key), [problem], 0, trace=Trace(), use_cache=False, time_budget=time_budget)
+
+
+def compare_all(table, algorithms=COMPARE_ALGORITHMS, *, executor=None, parallel=True, time_budget=None,
+                bootstrap=None):
+    """
+    Запуск нескольких алгоритмов на одной таблице.
+    Точки читаются из БД один раз; алгоритмы, результат которых есть в кэше,
+    не пересчитываются, остальные выполняются параллельно в пуле процессов
+    (parallel=False — последовательно в текущем процессе). Если пул сломан
+    (BrokenProcessPool), общий пул сбрасывается, а оставшиеся алгоритмы
+    считаются последовательно.
+    time_budget — бюджет времени итерационных методов (см. run_solver);
+    прерванные расчеты не кэшируются. bootstrap — число бутстреп-выборок
+    для доверительных интервалов a и b: они зависят только от таблицы,
+    поэтому считаются один раз и общие для всех алгоритмов.
+    Возвращает {ключ алгоритма: SolverResult} в порядке algorithms.
+    """
+    problem = FitProblem.from_table(table)
+
+    results, keys, pending = {}, {}, []
+    for key in algorithms:
+        spec = get_solver(key)
+        if spec.is_deterministic({}):
+            keys[key] = fit_cache.fit_key(problem, key, spec.options)
+            start_time = time.time()
+            cached = fit_cache.lookup(keys[key])
+            if cached is not None:
+                cached.cached = True
+                cached.exec_time = time.time() - start_time
+                results[key] = cached
+                continue
+        pending.append(key)
+
+    if parallel and len(pending) > 1:
+        pool = executor or get_pool()
+        computed = {}
+        try:
+            futures = {key: pool.submit(_run, key, problem, time_budget) for key in pending}
+            for key, future in futures.items():
+                computed[key] = future.result()
+        except BrokenProcessPool:
+            if executor is None:
+                reset_pool()
+            computed.update({key: _run(key, problem, time_budget) for key in pending if key not in computed})
+    else:
+        computed = {key: _run(key, problem, time_budget) for key in pending}
+
+    for key, result in computed.items():
+        if key in keys and not result.truncated:
+            fit_cache.store(keys[key], result)
+        results[key] = result
+
+    intervals = bootstrap_intervals(problem, resamples=bootstrap) if bootstrap else None
+    for result in results.values():
+        result.bootstrap = intervals
+
+    return {key: results[key] for key in algorithms}
+
+
+def save_all(results, *, user, table):
+    """
+    Сохраняет результаты сравнения одной транзакцией.
+    Возвращает список строк сводки (в порядке results).
+    """
+    from django.db import transaction
+
+    summary = []
+    with transaction.atomic():
+        for key, result in results.items():
+            spec = get_solver(key)
+            calculation, payload = save_result(spec, result, user=user, table=table)
+            summary.append({
+                'algorithm': key,
+                'label': spec.label,
+                'a': payload['a'],
+                'b': payload['b'],
+                'iterations': payload['iterations'],
+                'exec_time': payload['exec_time'],
+                'average_op': result.average_op,
+                'cached': result.cached,
+                'bootstrap': payload['bootstrap'],
+                'result_id': calculation.id,
+            })
+    return summary
+
+
+def rank_algorithms(results, *, gap_tol=OPTIMALITY_GAP_TOL):
+    """
+    Рейтинг алгоритмов по сохраненным расчетам results (QuerySet CalculationResult)
+    с учетом стоимости и качества, а не числа итераций.
+    Для каждого алгоритма: число расчетов, среднее число вычислений ошибки
+    и градиента, средний и наибольший зазор до оптимума МНК, среднее время.
+    Сначала идут алгоритмы, у которых все расчеты точны (зазор <= gap_tol),
+    внутри групп — по возрастанию среднего числа вычислений, затем зазора.
+    Расчеты без статистики вычислений (сохраненные до ее появления) не учитываются.
+    """
+    from django.db.models import Avg, Count, Max
+
+    rows = (results.filter(optimality_gap__isnull=False)
+            .order_by()
+            .values('algorithm')
+            .annotate(runs=Count('id'), loss_evaluations=Avg('loss_evaluations'),
+                      gradient_evaluations=Avg('gradient_evaluations'), mean_gap=Avg('optimality_gap'),
+                      max_gap=Max('optimality_gap'), exec_time=Avg('exec_time')))
+    ranking = []
+    for row in rows:
+        row['evaluations'] = (row['loss_evaluations'] or 0.0) + (row['gradient_evaluations'] or 0.0)
+        row['exact'] = row['max_gap'] <= gap_tol
+        ranking.append(row)
+    ranking.sort(key=lambda row: (not row['exact'], row['evaluations'], row['mean_gap']))
+    return ranking
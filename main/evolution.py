@@ -0,0 +1,115 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
+
+def pick_donors(rng, size, count=3):
+    """
+    Для каждой особи i — count различных индексов из остальных size - 1 особей
+    (массив формы (size, count)).
+    """
+    picks = np.argsort(rng.random((size, size - 1)), axis=1)[:, :count]
+    return picks + (picks >= np.arange(size)[:, None])
+
+
+def evolution(tables, table_ind, *, pop_size=20, mutation=(0.5, 1.0), crossover=0.9, bounds=(-5.0, 5.0),
+              tol=1e-10, atol=1e-20, max_iters=1000, stall=10, initial_params=None, seed=None, time_budget=None,
+              stop=None, trace=None):
+    """
+    Дифференциальная эволюция (DE/rand/1/bin).
+
+    Популяция pop_size особей хранится массивом (N, 2); мутация
+    v = x_r1 + F * (x_r2 - x_r3), биномиальное скрещивание и отбор выполняются
+    для всей популяции сразу, ошибка всех пробных векторов считается одним
+    пакетным вызовом (FitProblem.batch_mse) за поколение.
+    mutation — F или диапазон (F_min, F_max), из которого F выбирается
+    случайно на каждое поколение (dithering); crossover — вероятность CR.
+    Начальная популяция равномерна в квадрате bounds^2; initial_params
+    заменяет первую особь (область расширяется, чтобы включать ее).
+    Пробные векторы, вышедшие за область, отражаются от ее границ: на
+    вырожденных таблицах (одна точка, одинаковые x2) популяция иначе уходит
+    вдоль плоской долины. Расчет завершается, когда разброс ошибки в
+    популяции не больше tol * |средняя ошибка| + atol.
+    seed — зерно генератора; time_budget, stop — см. StoppingCriteria.
+    Критерии stop сравнивают лучшую особь с лучшей особью stall поколений
+    назад: одно поколение без удачных пробных векторов — не сходимость.
+    trace — необязательный Trace (лучшая особь, шаг — средний размах популяции).
+    Статистика (поколения, вычисления ошибки, доля успешных пробных векторов)
+    записывается в result.stats.
+    """
+    start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
+
+    problem = FitProblem.from_table(tables[table_ind])
+    if problem.n == 0:
+        return empty_result(trace)
+
+    rng = np.random.default_rng(seed)
+    pop_size = max(4, int(pop_size))
+    f_low, f_high = (mutation, mutation) if np.isscalar(mutation) else mutation
+
+    low, high = np.full(2, float(bounds[0])), np.full(2, float(bounds[1]))
+    population = rng.uniform(low, high, size=(pop_size, 2))
+    if initial_params is not None:
+        population[0] = initial_params
+        low, high = np.minimum(low, population[0]), np.maximum(high, population[0])
+    loss = problem.batch_mse(population)
+    evaluations = pop_size
+    successes = 0
+
+    rows = np.arange(pop_size)
+    best = int(np.argmin(loss))
+    history = deque([loss[best]], maxlen=stall + 1)
+    count = 0
+    while count < max_iters and not stop.expired(count):
+        count += 1
+        # мутация: v = x_r1 + F * (x_r2 - x_r3)
+        donors = pick_donors(rng, pop_size)
+        factor = rng.uniform(f_low, f_high)
+        mutant = population[donors[:, 0]] + factor * (population[donors[:, 1]] - population[donors[:, 2]])
+
+        # биномиальное скрещивание (хотя бы одна координата от мутанта)
+        mask = rng.random((pop_size, 2)) < crossover
+        mask[rows, rng.integers(0, 2, pop_size)] = True
+        trial = np.where(mask, mutant, population)
+        trial = np.where(trial < low, 2 * low - trial, trial)
+        trial = np.clip(np.where(trial > high, 2 * high - trial, trial), low, high)
+
+        # отбор: пробный вектор заменяет особь, если не хуже
+        trial_loss = problem.batch_mse(trial)
+        evaluations += pop_size
+        better = trial_loss <= loss
+        successes += int(better.sum())
+        population[better] = trial[better]
+        loss[better] = trial_loss[better]
+
+        best = int(np.argmin(loss))
+        spread = float(np.ptp(population, axis=0).mean())
+        if trace is not None:
+            trace.record(loss[best], population[best, 0], population[best, 1], spread)
+
+        if np.ptp(loss) <= tol * abs(float(np.mean(loss))) + atol:
+            break
+        if len(history) > stall and stop.converged(loss[best], history[0], spread):
+            break
+        history.append(loss[best])
+
+    a, b = population[best]
+    result = make_result(problem, a, b, count, start_time, trace, stop.truncated)
+    result.stats = {
+        'pop_size': pop_size,
+        'generations': count,
+        'evaluations': evaluations,
+        'success_rate': successes / (evaluations - pop_size) if count else 0.0,
+        'loss_spread': float(np.ptp(loss)) * problem.loss_scale,
+    }
+
+    print(f"Evolution completed in {result.exec_time:.3f} seconds with {count} generations "
+          f"({evaluations} evaluations)")
+
+    return result
@@ -0,0 +1,43 @@
+import hashlib
+import json
+
+import numpy as np
+from django.core.cache import caches
+
+FIT_CACHE_ALIAS = 'fits'
+FIT_CACHE_VERSION = 3
+
+
+def fit_key(problem, algorithm, options):
+    """
+    Ключ кэша по содержимому: набор точек (без учета порядка), температура,
+    алгоритм и его параметры.
+    """
+    order = np.lexsort((problem.gexp, problem.x2))
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(problem.x2[order], dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(problem.gexp[order], dtype=float).tobytes())
+    digest.update(repr(float(problem.temperature)).encode())
+    digest.update(algorithm.encode())
+    digest.update(json.dumps(options, sort_keys=True, default=repr).encode())
+    return f'fit:{digest.hexdigest()}'
+
+
+def get_cache():
+    """Кэш результатов (LocMemCache с LRU-вытеснением, см. CACHES['fits'])."""
+    return caches[FIT_CACHE_ALIAS]
+
+
+def lookup(key):
+    """SolverResult из кэша или None."""
+    return get_cache().get(key, version=FIT_CACHE_VERSION)
+
+
+def store(key, result):
+    """Сохраняет SolverResult (вместе с историей сходимости) в кэш."""
+    get_cache().set(key, result, version=FIT_CACHE_VERSION)
+
+
+def clear():
+    """Очистка кэша результатов."""
+    get_cache().clear()
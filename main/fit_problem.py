@@ -0,0 +1,253 @@
+import numpy as np
+
+R = 8.314462618
+
+# ограничение на размер блока матрицы остатков (элементов float64) в пакетном режиме
+MAX_BATCH_ELEMENTS = 1 << 20
+
+
+def solve_normal_equations(suu, suv, svv, sug, svg):
+    """
+    Решение нормальных уравнений 2x2:
+        [suu suv] [a]   [sug]
+        [suv svv] [b] = [svg]
+    Возвращает None, если матрица вырождена.
+    """
+    det = suu * svv - suv * suv
+    if abs(det) <= 1e-12 * max(suu * svv, 1e-300):
+        return None
+    a = (sug * svv - svg * suv) / det
+    b = (svg * suu - sug * suv) / det
+    return a, b
+
+
+def batch_solve_normal_equations(suu, suv, svv, sug, svg):
+    """
+    solve_normal_equations для массивов сумм (по одной системе 2x2 на элемент).
+    Возвращает массивы (a, b); для вырожденных систем — nan.
+    """
+    det = suu * svv - suv * suv
+    singular = np.abs(det) <= 1e-12 * np.maximum(suu * svv, 1e-300)
+    det = np.where(singular, np.nan, det)
+    return (sug * svv - svg * suv) / det, (svg * suu - sug * suv) / det
+
+
+class FitProblem:
+    """
+    Предвычисленная задача МНК для одной таблицы.
+
+    Модель g^E = RT * x1 * x2 * (a * x1 + b * x2) = a * u + b * v, где
+    u = RT * x1^2 * x2, v = RT * x1 * x2^2. Матрица Грама базиса и скалярные
+    произведения с gexp считаются один раз, после чего MSE для любых (a, b)
+    вычисляется за несколько операций независимо от числа точек:
+
+        MSE(a, b) = MSE* + da^2 * suu + 2 * da * db * suv + db^2 * svv,
+
+    где (a*, b*) — точный оптимум, da = a - a*, db = b - b*.
+    Все суммы нормированы на число точек n.
+
+    scale = (g_scale, a_scale, b_scale) задает обезразмеренную задачу
+    (см. scaled): g' = g / g_scale, a' = a / a_scale, b' = b / b_scale.
+
+    loss_evaluations и gradient_evaluations — счетчики вычислений ошибки
+    и градиента (по числу наборов параметров, в т.ч. в пакетных вызовах).
+    """
+
+    def __init__(self, x2, gexp, temperature, *, scale=(1.0, 1.0, 1.0)):
+        self.scale = tuple(float(s) for s in scale)
+        g_scale, a_scale, b_scale = self.scale
+        self.x2 = np.asarray(x2, dtype=float)
+        self.gexp = np.asarray(gexp, dtype=float) / g_scale
+        self.temperature = float(temperature)
+        self.rt = self.temperature * R
+        self.n = int(self.x2.size)
+
+        x1 = 1.0 - self.x2
+        self.u = self.rt * x1 * x1 * self.x2 * (a_scale / g_scale)
+        self.v = self.rt * x1 * self.x2 * self.x2 * (b_scale / g_scale)
+
+        n = max(self.n, 1)
+        self.suu = float(np.dot(self.u, self.u)) / n
+        self.suv = float(np.dot(self.u, self.v)) / n
+        self.svv = float(np.dot(self.v, self.v)) / n
+        self.sug = float(np.dot(self.u, self.gexp)) / n
+        self.svg = float(np.dot(self.v, self.gexp)) / n
+        self.sgg = float(np.dot(self.gexp, self.gexp)) / n
+
+        solution = solve_normal_equations(self.suu, self.suv, self.svv, self.sug, self.svg)
+        if solution is None:
+            if self.n:
+                # вырожденный случай — решение с минимальной нормой
+                sol, *_ = np.linalg.lstsq(np.column_stack((self.u, self.v)), self.gexp, rcond=None)
+                solution = float(sol[0]), float(sol[1])
+            else:
+                solution = 0.0, 0.0
+        self.a_opt, self.b_opt = solution
+
+        # минимальная ошибка считается по остаткам, а не по суммам (без потери точности)
+        residuals = self.a_opt * self.u + self.b_opt * self.v - self.gexp
+        self.min_loss = float(np.mean(residuals ** 2)) if self.n else 0.0
+
+        self.loss_evaluations = 0
+        self.gradient_evaluations = 0
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Строит задачу по объекту Table (один запрос к БД).
+        Готовый FitProblem возвращается как есть, поэтому решателям можно
+        передавать [problem] вместо списка таблиц.
+        """
+        if isinstance(table, cls):
+            return table
+        points = list(table.points.values_list('x_value', 'y_value'))
+        x2 = [p[0] for p in points]
+        gexp = [p[1] for p in points]
+        return cls(x2, gexp, table.temperature)
+
+    def points(self):
+        """Список (x2, gexp) в порядке хранения."""
+        return list(zip(self.x2.tolist(), self.gexp.tolist()))
+
+    def model(self, a, b, x2=None):
+        """Значения модели в точках таблицы (или в переданных x2)."""
+        if x2 is None:
+            return a * self.u + b * self.v
+        x2 = np.asarray(x2, dtype=float)
+        x1 = 1.0 - x2
+        g_scale, a_scale, b_scale = self.scale
+        return self.rt * x1 * x2 * (a * a_scale * x1 + b * b_scale * x2) / g_scale
+
+    def mse(self, a, b):
+        """MSE за O(1). a и b могут быть скалярами или numpy-массивами."""
+        da = a - self.a_opt
+        db = b - self.b_opt
+        self.loss_evaluations += getattr(da, 'size', 1)
+        return self.min_loss + da * da * self.suu + 2.0 * da * db * self.suv + db * db * self.svv
+
+    def batch_mse(self, params, *, residual_norms=False, chunk_size=None):
+        """
+        Пакетный расчет MSE для m наборов параметров params формы (m, 2).
+
+        Без residual_norms ошибка считается через достаточные статистики за O(m).
+        С residual_norms=True дополнительно возвращаются L2- и max-нормы остатков:
+        они требуют матрицы остатков (m x n), которая обрабатывается блоками по
+        chunk_size строк (по умолчанию — не больше MAX_BATCH_ELEMENTS элементов).
+        Возвращает mse или (mse, l2, linf).
+        """
+        params = np.asarray(params, dtype=float).reshape(-1, 2)
+        if not residual_norms:
+            return self.mse(params[:, 0], params[:, 1])
+
+        m = params.shape[0]
+        self.loss_evaluations += m
+        mse = np.zeros(m)
+        l2 = np.zeros(m)
+        linf = np.zeros(m)
+        if self.n == 0:
+            return mse, l2, linf
+
+        if chunk_size is None:
+            chunk_size = max(1, MAX_BATCH_ELEMENTS // self.n)
+        for start in range(0, m, chunk_size):
+            block = params[start:start + chunk_size]
+            r = block[:, :1] * self.u + block[:, 1:] * self.v - self.gexp
+            sq = np.einsum('ij,ij->i', r, r)
+            stop = start + block.shape[0]
+            mse[start:stop] = sq / self.n
+            l2[start:stop] = np.sqrt(sq)
+            linf[start:stop] = np.abs(r).max(axis=1)
+        return mse, l2, linf
+
+    def gradient(self, a, b):
+        """Точный градиент MSE по (a, b). Поддерживает numpy-массивы."""
+        da = a - self.a_opt
+        db = b - self.b_opt
+        self.gradient_evaluations += getattr(da, 'size', 1)
+        return 2.0 * (da * self.suu + db * self.suv), 2.0 * (da * self.suv + db * self.svv)
+
+    def hessian(self):
+        """Гессиан MSE (постоянный, т.к. модель линейна по параметрам)."""
+        return 2.0 * np.array([[self.suu, self.suv], [self.suv, self.svv]])
+
+    def optimum(self):
+        """Точный оптимум МНК (a*, b*)."""
+        return self.a_opt, self.b_opt
+
+    def optimality_gap(self, a, b):
+        """
+        Относительный зазор до точного оптимума МНК: (MSE(a, b) - MSE*) / MSE*.
+        Превышение считается по отклонению от (a*, b*), без вычитания близких
+        чисел. Знаменатель не меньше 1e-12 * mean(gexp^2), чтобы для данных,
+        точно описываемых моделью (MSE* ~ 0), зазор оставался конечным.
+        Не зависит от масштаба задачи и не учитывается в счетчиках.
+        """
+        excess = self._excess_loss(a, b)
+        reference = max(self.min_loss, 1e-12 * self.sgg)
+        return excess / reference if reference > 0 else excess
+
+    def standard_errors(self, a, b):
+        """
+        Стандартные ошибки a, b и коэффициент корреляции a–b в точке (a, b)
+        по якобиану остатков J = [u, v]: cov = s^2 (J^T J)^-1, s^2 = RSS / (n - 2).
+        J^T J = n * [[suu, suv], [suv, svv]] уже предвычислена, поэтому расчет
+        выполняется за O(1) и не учитывается в счетчиках.
+        Возвращает (a_se, b_se, correlation) в единицах задачи или None,
+        если n <= 2 или J^T J вырождена.
+        """
+        det = self.suu * self.svv - self.suv * self.suv
+        if self.n <= 2 or det <= 1e-12 * max(self.suu * self.svv, 1e-300):
+            return None
+        rss = self.n * (self.min_loss + self._excess_loss(a, b))
+        scale = rss / (self.n - 2) / (self.n * det)
+        correlation = -self.suv / np.sqrt(self.suu * self.svv)
+        return float(np.sqrt(scale * self.svv)), float(np.sqrt(scale * self.suu)), float(correlation)
+
+    def _excess_loss(self, a, b):
+        """MSE(a, b) - MSE* по отклонению от оптимума (без вычитания близких чисел)."""
+        da = a - self.a_opt
+        db = b - self.b_opt
+        return max(float(da * da * self.suu + 2.0 * da * db * self.suv + db * db * self.svv), 0.0)
+
+    def scaled(self):
+        """
+        Обезразмеренная и предобусловленная задача.
+
+        g^E делится на RT и размах безразмерных данных max|g^E / RT|, т.е. на
+        g_scale = max|g^E| (для нулевых данных — на RT), так что |g'| <= 1.
+        Параметры масштабируются так, чтобы столбцы
+        u, v имели единичное среднеквадратичное значение: диагональ гессиана
+        равна 2 для любой таблицы и температуры (предобуславливание Якоби).
+        Допуски решателей (eps и т.п.) в такой задаче означают одно и то же
+        для всех таблиц. Пересчет параметров — to_original / to_scaled.
+        """
+        g_scale, a_scale, b_scale = self.scale
+        data_range = float(np.max(np.abs(self.gexp))) * g_scale if self.n else 0.0
+        g_new = data_range if data_range > 0 else self.rt
+        rms_u = np.sqrt(self.suu) * g_scale / a_scale
+        rms_v = np.sqrt(self.svv) * g_scale / b_scale
+        a_new = g_new / rms_u if rms_u > 0 else 1.0
+        b_new = g_new / rms_v if rms_v > 0 else 1.0
+        return FitProblem(self.x2, self.gexp * g_scale, self.temperature, scale=(g_new, a_new, b_new))
+
+    def to_original(self, a, b):
+        """Параметры в исходных единицах по параметрам этой задачи."""
+        return a * self.scale[1], b * self.scale[2]
+
+    def to_scaled(self, a, b):
+        """Параметры этой задачи по параметрам в исходных единицах."""
+        return a / self.scale[1], b / self.scale[2]
+
+    @property
+    def loss_scale(self):
+        """Множитель перевода MSE этой задачи в исходные единицы."""
+        return self.scale[0] ** 2
+
+
+def evaluate_batch(tables, table_ind, params, *, residual_norms=False, chunk_size=None):
+    """
+    Пакетная оценка ошибки для таблицы tables[table_ind]: params формы (m, 2).
+    См. FitProblem.batch_mse.
+    """
+    problem = FitProblem.from_table(tables[table_ind])
+    return problem.batch_mse(params, residual_norms=residual_norms, chunk_size=chunk_size)
@@ -1,6 +1,10 @@
 import time
 import numpy as np
 
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
 
 def func(a, b, x2, tables, table_ind):
     """Модель: g^E = RT * x1 * x2 * (a * x1 + b * x2)."""
@@ -17,27 +21,52 @@ def sum_of_deviations(a, b, tables, table_ind, l_points):
     return float(np.mean((gmod - gexp) ** 2))
 
 
-def gauss(tables, table_ind, *, eps=1e-7, max_iters=100000, init_step=0.01):
+def gauss(tables, table_ind, *, eps=1e-7, max_iters=100000, init_step=0.01, exact=False,
+          initial_params=(1.0, 1.0), time_budget=None, stop=None, trace=None):
+    """
+    Покоординатный спуск (метод Гаусса).
+    exact=True — точный минимум MSE по каждой координате вместо пробных шагов ±da/±db.
+    initial_params — начальное приближение (a, b).
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
+    """
     start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
 
-    l_points = [(p.x_value, p.y_value) for p in tables[table_ind].points.all()]
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
     if not l_points:
-        return 0.0, 0.0, 0, 0.0, [0.0, 1.0], [0, 0], [0, 0], [0, 0], [0, 0], 0.0
+        return empty_result(trace)
 
     # начальные параметры
-    a, b = 1.0, 1.0
+    a, b = float(initial_params[0]), float(initial_params[1])
     da, db = init_step, init_step
-    val = sum_of_deviations(a, b, tables, table_ind, l_points)
+    val = problem.mse(a, b)
 
     count = 0
     while count < max_iters:
+        if stop.expired(count):
+            break
         count += 1
         pa, pb, pval = a, b, val
 
+        if exact:
+            # точный минимум по "a", затем по "b"
+            if problem.suu > 0:
+                a = (problem.sug - b * problem.suv) / problem.suu
+            if problem.svv > 0:
+                b = (problem.svg - a * problem.suv) / problem.svv
+            val = problem.mse(a, b)
+            if trace is not None:
+                trace.record(val, a, b, abs(a - pa) + abs(b - pb))
+            if abs(val - pval) < eps or stop.converged(val, pval, abs(a - pa) + abs(b - pb)):
+                break
+            continue
+
         # пробуем шаг по "a"
         for sign in (+1, -1):
             new_a = a + sign * da
-            new_val = sum_of_deviations(new_a, b, tables, table_ind, l_points)
+            new_val = problem.mse(new_a, b)
             if new_val < val:
                 a, val = new_a, new_val
                 break  # нашли улучшение → выходим из цикла
@@ -45,11 +74,16 @@ def gauss(tables, table_ind, *, eps=1e-7, max_iters=100000, init_step=0.01):
         # пробуем шаг по "b"
         for sign in (+1, -1):
             new_b = b + sign * db
-            new_val = sum_of_deviations(a, new_b, tables, table_ind, l_points)
+            new_val = problem.mse(a, new_b)
             if new_val < val:
                 b, val = new_b, new_val
                 break
 
+        if trace is not None:
+            trace.record(val, a, b, max(da, db))
+        if stop.converged(val, pval, abs(a - pa) + abs(b - pb)):
+            break
+
         # адаптация шага
         if abs(val - pval) < eps:
             da *= 0.5
@@ -57,28 +91,8 @@ def gauss(tables, table_ind, *, eps=1e-7, max_iters=100000, init_step=0.01):
             if da < 1e-6 and db < 1e-6:
                 break  # шаг слишком мал → выходим
 
-    # === Формирование данных для таблицы ===
-    l_x2, l_gmod, l_gexp, l_op, l_ap = [0.0], [0], [0], [0], [0]
-    for x2, gexp in l_points:
-        gmod = func(a, b, x2, tables, table_ind)
-        l_x2.append(x2)
-        l_gexp.append(gexp)
-        l_gmod.append(round(gmod))
-        if gexp != 0:
-            l_op.append(round(abs((gmod - gexp) / gexp * 100), 1))
-        else:
-            l_op.append(0)
-        l_ap.append(round(abs(gmod - gexp)))
-
-    l_x2.append(1.0)
-    l_gmod.append(0)
-    l_gexp.append(0)
-    l_op.append(0)
-    l_ap.append(0)
-
-    exec_time = time.time() - start_time
-    avg_op = round(sum(l_op) / len(l_op), 1)
-
-    print(f"Gauss completed in {exec_time:.3f} seconds with {count} iterations")
-
-    return a, b, count, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op
+    result = make_result(problem, a, b, count, start_time, trace, stop.truncated)
+
+    print(f"Gauss completed in {result.exec_time:.3f} seconds with {count} iterations")
+
+    return result
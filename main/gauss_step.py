@@ -1,6 +1,10 @@
 import time
 import numpy as np
 
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
 
 def func(a, b, x2, tables, table_ind):
     """
@@ -21,19 +25,25 @@ def sum_of_deviations(a, b, tables, table_ind, l_points):
     return float(np.mean((gmod - gexp) ** 2))
 
 
-def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000):
+def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000, initial_params=(1.0, 1.0),
+               time_budget=None, stop=None, trace=None):
     """
     Оптимизированный метод координатного спуска.
+    initial_params — начальное приближение (a, b).
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
     """
     start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
 
     # Точки (x2, gexp)
-    l_points = [(p.x_value, p.y_value) for p in tables[table_ind].points.all()]
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
     if not l_points:
-        return 0.0, 0.0, 0, 0.0, [0.0, 1.0], [0, 0], [0, 0], [0, 0], [0, 0], 0.0
+        return empty_result(trace)
 
     # Начальные значения
-    a, b = 1.0, 1.0
+    a, b = float(initial_params[0]), float(initial_params[1])
     da, db = 1e-3, 1e-3
     const_learning = 1.01
     iter_max = 10
@@ -42,9 +52,9 @@ def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000):
     count_iter_a, count_iter_b = 0, 0
     f_stepa, b_stepa, f_stepb, b_stepb = True, True, True, True
 
-    current_loss = sum_of_deviations(a, b, tables, table_ind, l_points)
+    current_loss = problem.mse(a, b)
 
-    while True:
+    while not stop.expired(count):
         pa, pb = a, b
         prev_loss = current_loss
 
@@ -54,8 +64,8 @@ def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000):
         else:
             da = 1e-4
 
-        loss_plus = sum_of_deviations(a + da, b, tables, table_ind, l_points)
-        loss_minus = sum_of_deviations(a - da, b, tables, table_ind, l_points)
+        loss_plus = problem.mse(a + da, b)
+        loss_minus = problem.mse(a - da, b)
 
         if loss_plus < current_loss:
             a += da
@@ -78,8 +88,8 @@ def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000):
         else:
             db = 1e-4
 
-        loss_plus = sum_of_deviations(a, b + db, tables, table_ind, l_points)
-        loss_minus = sum_of_deviations(a, b - db, tables, table_ind, l_points)
+        loss_plus = problem.mse(a, b + db)
+        loss_minus = problem.mse(a, b - db)
 
         if loss_plus < current_loss:
             b += db
@@ -97,36 +107,17 @@ def gauss_step(tables, table_ind, *, eps=1e-7, max_iters=5000):
             count_iter_b += 1
 
         count += 1
+        if trace is not None:
+            trace.record(current_loss, a, b, max(da, db))
 
         # Критерий остановки
         if abs(current_loss - prev_loss) < eps or count >= max_iters:
             break
+        if stop.converged(current_loss, prev_loss, abs(a - pa) + abs(b - pb)):
+            break
 
-        print(a, b, "gauss_step", table_ind)
-
-    # === Формирование данных для таблицы ===
-    l_x2, l_gmod, l_gexp, l_op, l_ap = [0.0], [0], [0], [0], [0]
-
-    for x2, gexp in l_points:
-        gmod = func(a, b, x2, tables, table_ind)
-        l_x2.append(x2)
-        l_gexp.append(gexp)
-        l_gmod.append(round(gmod))
-        if gexp != 0:
-            l_op.append(round(abs((gmod - gexp) / gexp * 100), 1))
-        else:
-            l_op.append(0)
-        l_ap.append(round(abs(gmod - gexp)))
-
-    l_x2.append(1.0)
-    l_gmod.append(0)
-    l_gexp.append(0)
-    l_op.append(0)
-    l_ap.append(0)
-
-    exec_time = time.time() - start_time
-    avg_op = round(sum(l_op) / len(l_op), 1)
+    result = make_result(problem, a, b, count, start_time, trace, stop.truncated)
 
-    print(f"Gauss_step completed in {exec_time:.3f} seconds with {count} iterations")
+    print(f"Gauss_step completed in {result.exec_time:.3f} seconds with {count} iterations")
 
-    return a, b, count, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op
+    return result
@@ -1,6 +1,10 @@
 import time
 import numpy as np
 
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
 
 def func(params, x2, temperature):
     """
@@ -23,54 +27,61 @@ def sum_of_deviations(params, x2_arr, gexp_arr, temperature):
     return float(np.mean(errs)) if errs.size > 0 else 0.0
 
 
-def derivative(params, x2_arr, gexp_arr, temperature):
+def derivative(params, x2_arr, gexp_arr, temperature, problem=None):
     """
-    Численный градиент (центральная разность) с адаптивным шагом h.
-    Возвращает градиент по a и b.
+    Аналитический градиент MSE по a и b (через FitProblem.gradient).
+    Если передан problem (FitProblem), точки x2_arr, gexp_arr не используются.
     """
-    params = np.asarray(params, dtype=float)
-    grad = np.zeros_like(params)
-    base = sum_of_deviations(params, x2_arr, gexp_arr, temperature)
+    if problem is None:
+        problem = FitProblem(x2_arr, gexp_arr, temperature)
+    grad_a, grad_b = problem.gradient(params[0], params[1])
+    return [float(grad_a), float(grad_b)]
+
 
-    # адаптивный h в зависимости от масштаба параметра
-    for i in range(len(params)):
-        p = params[i]
-        h = max(1e-6, abs(p) * 1e-6)  # можно настроить
-        # центральная разность
-        p_plus = params.copy()
-        p_minus = params.copy()
-        p_plus[i] += h
-        p_minus[i] -= h
-        f_plus = sum_of_deviations(p_plus, x2_arr, gexp_arr, temperature)
-        f_minus = sum_of_deviations(p_minus, x2_arr, gexp_arr, temperature)
-        grad[i] = (f_plus - f_minus) / (2 * h)
-    return grad.tolist()
+def initial_step(grad, hess):
+    """
+    Шаг точной минимизации квадратичной функции вдоль -grad:
+    t = (g^T g) / (g^T H g). Если кривизна неположительна — 1.0.
+    """
+    curvature = float(grad @ hess @ grad)
+    if curvature <= 0:
+        return 1.0
+    return float(grad @ grad) / curvature
 
 
-def gradient(tables, table_ind, *, eps=1e-5, initial_params=(0.0, 0.0), max_iters=10000):
+def armijo_step(loss_fn, params, loss, grad, direction, t, *, alpha=0.3, beta=0.5, min_step=1e-8):
+    """
+    Backtracking line search: шаг t уменьшается в beta раз, пока не выполнится
+    условие Армихо f(x + t p) <= f(x) + alpha * t * grad^T p.
+    Возвращает (t, x + t p, f(x + t p)) или None, если t стал меньше min_step.
+    """
+    slope = float(np.dot(grad, direction))
+    while t > min_step:
+        new_params = params + t * direction
+        new_loss = loss_fn(new_params)
+        if new_loss <= loss + alpha * t * slope:
+            return t, new_params, new_loss
+        t *= beta
+    return None
+
+
+def gradient(tables, table_ind, *, eps=1e-5, initial_params=(0.0, 0.0), max_iters=10000,
+             time_budget=None, stop=None, trace=None):
     """
     Оптимизированный градиентный спуск с backtracking line search (Armijo).
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
     Возвращает:
     a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, average_op
     """
     start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
 
-    # Извлекаем точки в numpy-массивы (чтобы обращаться к БД только один раз)
-    table = tables[table_ind]
-    points = list(table.points.all())
-    if len(points) == 0:
+    # Предвычисленная задача (к БД обращаемся только один раз)
+    problem = FitProblem.from_table(tables[table_ind])
+    if problem.n == 0:
         # пустая таблица — возвращаем нули в том же формате
-        l_x2 = [0.0, 1.0]
-        l_gmod = [0, 0]
-        l_gexp = [0, 0]
-        l_op = [0, 0]
-        l_ap = [0, 0]
-        exec_time = time.time() - start_time
-        return 0.0, 0.0, 0, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, 0.0
-
-    x2_arr = np.array([p.x_value for p in points], dtype=float)
-    gexp_arr = np.array([p.y_value for p in points], dtype=float)
-    temperature = float(table.temperature)
+        return empty_result(trace)
 
     params = np.array(initial_params, dtype=float)
     it = 0
@@ -78,54 +89,167 @@ def gradient(tables, table_ind, *, eps=1e-5, initial_params=(0.0, 0.0), max_iter
     # параметры для backtracking line search
     alpha = 0.3   # параметр Armijo
     beta = 0.5    # уменьшение шага
-    base_loss = sum_of_deviations(params, x2_arr, gexp_arr, temperature)
+    base_loss = problem.mse(params[0], params[1])
+    hess = problem.hessian()
 
-    while it < max_iters:
+    while it < max_iters and not stop.expired(it):
         it += 1
-        grad = np.array(derivative(params, x2_arr, gexp_arr, temperature), dtype=float)
+        grad = np.array(problem.gradient(params[0], params[1]), dtype=float)
         grad_norm = np.linalg.norm(grad)
-        if grad_norm < eps:
+        if grad_norm < eps or stop.converged(grad_norm=grad_norm):
             break
+        prev_loss = base_loss
 
-        # направление -grad (минимизация)
-        direction = -grad
-        # начальный шаг (можно подбирать)
-        t = 1.0
-
-        # backtracking line search (Armijo condition)
-        while t > 1e-8:
-            new_params = params + t * direction
-            new_loss = sum_of_deviations(new_params, x2_arr, gexp_arr, temperature)
-            # Armijo условие: f(x + t p) <= f(x) + alpha * t * grad^T p
-            if new_loss <= base_loss + alpha * t * np.dot(grad, direction):
-                params = new_params
-                base_loss = new_loss
-                break
-            else:
-                t *= beta
+        # направление -grad, начальный шаг — точный минимум вдоль направления (по гессиану),
+        # затем backtracking line search (Armijo condition)
+        step = armijo_step(lambda p: problem.mse(p[0], p[1]), params, base_loss, grad, -grad,
+                           initial_step(grad, hess), alpha=alpha, beta=beta)
 
         # если шаг слишком мал — выходим
-        if t <= 1e-8:
+        if step is None:
             break
+        t, params, base_loss = step
+        if trace is not None:
+            trace.record(base_loss, params[0], params[1], t * grad_norm)
+        if stop.converged(base_loss, prev_loss, t * grad_norm):
+            break
+
+    result = make_result(problem, params[0], params[1], it, start_time, trace, stop.truncated)
+
+    print(f"Gradient completed in {result.exec_time:.3f} seconds with {it} iterations")
+
+    return result
+
+
+def batch_initial_step(grads, hess):
+    """
+    initial_step для каждой строки grads формы (m, 2):
+    t = (g^T g) / (g^T H g), 1.0 при неположительной кривизне.
+    """
+    curvature = np.einsum('ij,jk,ik->i', grads, hess, grads)
+    norms2 = np.einsum('ij,ij->i', grads, grads)
+    safe = np.where(curvature > 0, curvature, 1.0)
+    return np.where(curvature > 0, norms2 / safe, 1.0)
+
+
+def basin_stats(points, losses, *, tol=1e-3):
+    """
+    Группировка конечных точек по бассейнам притяжения: в порядке возрастания
+    ошибки точка относится к первому бассейну, центр которого ближе
+    tol * (1 + |центр|), иначе образует новый.
+    Возвращает список {'a', 'b', 'loss', 'count'} по возрастанию loss.
+    """
+    basins = []
+    for i in np.argsort(losses, kind='stable'):
+        point = points[i]
+        for basin in basins:
+            center = basin[0]
+            if np.linalg.norm(point - center) <= tol * (1.0 + np.linalg.norm(center)):
+                basin[2] += 1
+                break
+        else:
+            basins.append([point, float(losses[i]), 1])
+    return [{'a': float(c[0]), 'b': float(c[1]), 'loss': loss, 'count': count} for c, loss, count in basins]
+
 
-    # Формируем данные для таблицы в формате, аналогичном вашему
-    l_x2 = [0.0] + [float(x) for x in x2_arr.tolist()] + [1.0]
-    l_gexp = [0] + [float(g) for g in gexp_arr.tolist()] + [0]
-    # вычисляем модельные значения и метрики
-    gmod_vals = func(params, x2_arr, temperature)
-    l_gmod = [0] + [float(np.round(v, 6)) for v in gmod_vals.tolist()] + [0]
+def gradient_multistart(tables, table_ind, *, n_starts=16, bounds=(0.0, 5.0), eps=1e-5, max_iters=10000,
+                        initial_params=None, seed=None, basin_tol=1e-3, time_budget=None, stop=None, trace=None):
+    """
+    Градиентный спуск из n_starts случайных стартовых точек одновременно.
+
+    Точки хранятся массивом (N, 2) и продвигаются вместе: градиенты, начальные
+    шаги и backtracking line search (Armijo) считаются векторно по строкам,
+    сошедшиеся (|grad| < eps) и остановившиеся (шаг < 1e-8) строки выбывают.
+    Стартовые точки — равномерно из квадрата bounds^2; initial_params
+    заменяет первую из них. seed — зерно генератора.
+    Возвращается лучший найденный оптимум; в result.stats — число стартов,
+    сошедшихся строк, итераций по строкам и бассейны конечных точек
+    в исходных единицах (см. basin_stats), iterations — число векторных шагов.
+    """
+    start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
 
-    # вычисляем проценты и абсолютные отклонения; безопасно для нуля
-    deltas = np.abs(gmod_vals - gexp_arr)
-    with np.errstate(divide='ignore', invalid='ignore'):
-        sigmas = np.where(gexp_arr != 0, (deltas / np.abs(gexp_arr)) * 100.0, 0.0)
+    problem = FitProblem.from_table(tables[table_ind])
+    if problem.n == 0:
+        return empty_result(trace)
 
-    l_op = [0] + [float(np.round(s, 1)) for s in sigmas.tolist()] + [0]
-    l_ap = [0] + [float(np.round(d, 6)) for d in deltas.tolist()] + [0]
+    rng = np.random.default_rng(seed)
+    params = rng.uniform(bounds[0], bounds[1], size=(n_starts, 2))
+    if initial_params is not None:
+        params[0] = initial_params
+    loss = problem.batch_mse(params)
+    row_iters = np.zeros(n_starts, dtype=int)
+    converged = np.zeros(n_starts, dtype=bool)
+    evaluations = n_starts
 
-    exec_time = time.time() - start_time
-    avg_op = float(np.round(np.mean(l_op[1:-1]) if len(l_op) > 2 else 0.0, 1))
+    alpha, beta = 0.3, 0.5
+    hess = problem.hessian()
+    active = np.arange(n_starts)
 
-    print(f"Gradient completed in {exec_time:.3f} seconds with {it} iterations")
+    it = 0
+    while active.size and it < max_iters and not stop.expired(it):
+        it += 1
+        x = params[active]
+        grad = np.column_stack(problem.gradient(x[:, 0], x[:, 1]))
+        grad_norm = np.sqrt(np.einsum('ij,ij->i', grad, grad))
+
+        done = grad_norm < eps
+        converged[active[done]] = True
+        keep = ~done
+        active, x, grad, grad_norm = active[keep], x[keep], grad[keep], grad_norm[keep]
+        if not active.size:
+            break
 
-    return float(params[0]), float(params[1]), it, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op
+        # векторный backtracking line search: строки ждут, пока не выполнится условие Армихо
+        t = batch_initial_step(grad, hess)
+        prev_loss = loss[active]
+        new_loss = prev_loss.copy()
+        new_x = x.copy()
+        slope = -grad_norm * grad_norm  # grad^T p при p = -grad
+        pending = np.ones(active.size, dtype=bool)
+        while True:
+            rows = np.flatnonzero(pending & (t > 1e-8))
+            if not rows.size:
+                break
+            candidates = x[rows] - t[rows, None] * grad[rows]
+            candidate_loss = problem.batch_mse(candidates)
+            evaluations += rows.size
+            ok = candidate_loss <= prev_loss[rows] + alpha * t[rows] * slope[rows]
+            accepted = rows[ok]
+            new_x[accepted] = candidates[ok]
+            new_loss[accepted] = candidate_loss[ok]
+            pending[accepted] = False
+            t[rows[~ok]] *= beta
+
+        params[active] = new_x
+        loss[active] = new_loss
+        row_iters[active[~pending]] += 1
+
+        best = int(np.argmin(loss))
+        if trace is not None:
+            trace.record(loss[best], params[best, 0], params[best, 1], float(np.max(t * grad_norm)))
+
+        # выбывают строки без шага Армихо и сошедшиеся по общим критериям
+        finished = pending | stop.converged_rows(new_loss, prev_loss, t * grad_norm, grad_norm)
+        active = active[~finished]
+
+    best = int(np.argmin(loss))
+    basins = basin_stats(np.column_stack(problem.to_original(params[:, 0], params[:, 1])),
+                         loss * problem.loss_scale, tol=basin_tol)
+
+    result = make_result(problem, params[best, 0], params[best, 1], it, start_time, trace, stop.truncated)
+    result.stats = {
+        'n_starts': n_starts,
+        'converged': int(converged.sum()),
+        'evaluations': int(evaluations),
+        'iterations_mean': float(row_iters.mean()),
+        'iterations_max': int(row_iters.max()),
+        'n_basins': len(basins),
+        'best_basin_share': basins[0]['count'] / n_starts,
+        'basins': basins,
+    }
+
+    print(f"Gradient_multistart completed in {result.exec_time:.3f} seconds with {it} iterations "
+          f"({n_starts} starts, {len(basins)} basins)")
+
+    return result
@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import time
+import traceback
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import FitJob
+from .solvers import get_solver, run_solver, save_result
+from .trace import Trace
+
+# после стольких захватов зависшее задание не возвращается в очередь, а завершается с ошибкой
+MAX_ATTEMPTS = 3
+
+
+def worker_name():
+    """Имя обработчика: хост и PID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(user, table, algorithm, *, warm=None):
+    """Ставит расчет в очередь; algorithm — ключ реестра solvers."""
+    get_solver(algorithm)
+    return FitJob.objects.create(user=user, table=table, algorithm=algorithm, options={'warm': warm})
+
+
+def claim_job(worker):
+    """
+    Забирает самое старое задание из очереди и помечает его как выполняемое.
+    На БД с SELECT ... FOR UPDATE SKIP LOCKED (PostgreSQL) строки, заблокированные
+    другими обработчиками, пропускаются. На SQLite захват — условный UPDATE
+    (status = 'pending'): задание получает тот, чей UPDATE изменил строку.
+    Возвращает FitJob или None, если очередь пуста.
+    """
+    pending = FitJob.objects.filter(status='pending').order_by('created_at', 'id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = pending.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status, job.worker, job.started_at = 'running', worker, timezone.now()
+            job.attempts += 1
+            job.save(update_fields=['status', 'worker', 'started_at', 'attempts'])
+            return job
+
+    while True:
+        job_id = pending.values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = FitJob.objects.filter(id=job_id, status='pending').update(
+            status='running', worker=worker, started_at=timezone.now(), attempts=F('attempts') + 1)
+        if claimed:
+            return FitJob.objects.get(id=job_id)
+
+
+def reclaim_stale(stale_after=None):
+    """
+    Задания, которые выполняются дольше stale_after сек (по умолчанию
+    settings.FIT_JOB_STALE_AFTER), считаются брошенными: обработчик завершился,
+    не сохранив результат. Они возвращаются в очередь, а после MAX_ATTEMPTS
+    захватов завершаются с ошибкой.
+    Возвращает (число возвращенных, число завершенных).
+    """
+    if stale_after is None:
+        stale_after = settings.FIT_JOB_STALE_AFTER
+    now = timezone.now()
+    stale = FitJob.objects.filter(status='running', started_at__lt=now - timedelta(seconds=stale_after))
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed', error="Обработчик не завершил задание", finished_at=now)
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='pending', worker='', started_at=None)
+    return requeued, failed
+
+
+def run_job(job):
+    """Выполняет задание и сохраняет CalculationResult и JSON-ответ в задании."""
+    try:
+        if job.table is None:
+            raise ValueError("Таблица была удалена")
+        spec = get_solver(job.algorithm)
+        trace = Trace(callback=lambda progress: FitJob.objects.filter(id=job.id).update(progress=progress))
+        result = run_solver(spec, [job.table], 0, warm=job.options.get('warm'), trace=trace,
+                            time_budget=settings.FIT_TIME_BUDGET, bootstrap=settings.FIT_BOOTSTRAP_RESAMPLES)
+        job.progress = result.trace.progress() if result.trace is not None else None
+        calculation, payload = save_result(spec, result, user=job.user, table=job.table)
+        job.result = calculation
+        job.response = {'algorithm': job.algorithm, **payload}
+        job.status = 'done'
+    except Exception as e:
+        print(traceback.format_exc())
+        job.error = str(e)
+        job.status = 'failed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['result', 'progress', 'response', 'error', 'status', 'finished_at'])
+    return job
+
+
+def work(*, worker=None, poll_interval=1.0, once=False, max_jobs=None):
+    """
+    Цикл обработчика: забирает и выполняет задания; перед захватом
+    возвращает в очередь брошенные задания (reclaim_stale).
+    once=True — выйти, когда очередь опустеет; max_jobs — ограничение числа заданий.
+    Возвращает число выполненных заданий.
+    """
+    worker = worker or worker_name()
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        reclaim_stale()
+        job = claim_job(worker)
+        if job is None:
+            if once:
+                break
+            # пока очередь пуста, не держим устаревшие соединения
+            close_old_connections()
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        done += 1
+    return done
+
+
+def sse(event, data):
+    """Одно событие Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def job_events(job_id, *, poll_interval=1.0, heartbeat=15.0, timeout=30.0):
+    """
+    Поток SSE-событий задания: progress (итерация, MSE, a, b) при каждом
+    изменении прогресса, затем done или failed. Прогресс читается из строки
+    FitJob (раз в poll_interval сек), которую обновляет обработчик.
+    Поток держит поток gthread-воркера, поэтому закрывается через timeout сек:
+    EventSource переподключается сам и получает последний прогресс заново.
+    """
+    last = None
+    started = beat = time.monotonic()
+    while time.monotonic() - started < timeout:
+        row = FitJob.objects.filter(id=job_id).values('status', 'progress', 'error').first()
+        if row is None:
+            yield sse('failed', {'error': 'Задание не найдено'})
+            return
+
+        if row['progress'] is not None and row['progress'] != last:
+            last = row['progress']
+            beat = time.monotonic()
+            yield sse('progress', last)
+
+        if row['status'] == 'done':
+            yield sse('done', {'job_id': job_id})
+            return
+        if row['status'] == 'failed':
+            yield sse('failed', {'error': row['error']})
+            return
+
+        if time.monotonic() - beat >= heartbeat:
+            beat = time.monotonic()
+            yield ": keep-alive\n\n"
+        time.sleep(poll_interval)
@@ -0,0 +1,61 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.batch import fit_all
+from main.compare import COMPARE_ALGORITHMS
+from main.models import Table
+from main.solvers import SOLVERS
+
+
+class Command(BaseCommand):
+    help = "Расчет параметров a, b для всех таблиц выбранными алгоритмами (пул процессов, bulk_create)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--algorithms', nargs='+', default=list(COMPARE_ALGORITHMS), choices=sorted(SOLVERS),
+            help="Алгоритмы (по умолчанию пять основных методов)",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="Число процессов (1 — без пула)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50,
+            help="Сколько таблиц читать из БД и сохранять за раз",
+        )
+        parser.add_argument(
+            '--user',
+            help="Имя пользователя-владельца результатов (по умолчанию автор таблицы)",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--workers и --chunk-size должны быть положительными")
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Пользователь {options['user']} не найден")
+
+        def progress(fits, tables, skipped, elapsed):
+            rate = fits / elapsed if elapsed > 0 else 0.0
+            self.stdout.write(f"Таблиц: {tables}, пропущено: {skipped}, расчетов: {fits} ({rate:.1f} расчетов/сек)")
+
+        fits, tables, skipped, elapsed = fit_all(
+            Table.objects.select_related('author').order_by('id'),
+            options['algorithms'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            user=user,
+            progress=progress,
+        )
+
+        rate = fits / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: {fits} расчетов для {tables} таблиц за {elapsed:.2f} сек ({rate:.1f} расчетов/сек), "
+            f"пропущено таблиц: {skipped}"
+        ))
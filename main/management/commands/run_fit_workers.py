@@ -0,0 +1,44 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _worker_main(options):
+    """Точка входа дочернего процесса (spawn): настройка Django и цикл обработчика."""
+    import django
+    django.setup()
+
+    from main.jobs import work
+    work(poll_interval=options['poll_interval'], once=options['once'], max_jobs=options['max_jobs'])
+
+
+class Command(BaseCommand):
+    help = "Обработчики очереди расчетов (FitJob); можно запускать на нескольких узлах"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Число процессов-обработчиков")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Пауза (сек) между опросами пустой очереди")
+        parser.add_argument('--once', action='store_true', help="Завершиться, когда очередь опустеет")
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help="Максимум заданий на процесс")
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError("--processes должно быть положительным")
+
+        if options['processes'] == 1:
+            from main.jobs import work
+            done = work(poll_interval=options['poll_interval'], once=options['once'], max_jobs=options['max_jobs'])
+            self.stdout.write(self.style.SUCCESS(f"Выполнено заданий: {done}"))
+            return
+
+        worker_options = {key: options[key] for key in ('poll_interval', 'once', 'max_jobs')}
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=_worker_main, args=(worker_options,))
+                     for _ in range(options['processes'])]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Запущено обработчиков: {len(processes)}")
+        for process in processes:
+            process.join()
@@ -0,0 +1,121 @@
+import time
+import numpy as np
+
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
+
+def residuals(params, problem):
+    """Остатки модели r = gmod - gexp (учитывается как вычисление ошибки)."""
+    problem.loss_evaluations += 1
+    return problem.model(params[0], params[1]) - problem.gexp
+
+
+def jacobian(params, problem):
+    """
+    Якобиан остатков по (a, b): столбцы u = RT * x1^2 * x2, v = RT * x1 * x2^2.
+    Для текущей модели не зависит от params (учитывается как вычисление градиента).
+    """
+    problem.gradient_evaluations += 1
+    return np.column_stack((problem.u, problem.v))
+
+
+def levenberg_marquardt(residual_fn, jacobian_fn, x0, *, constant_jacobian=False,
+                        eps=1e-10, max_iters=100, lam=1e-3, stop=None, trace=None):
+    """
+    Демпфированный метод Гаусса — Ньютона (Левенберга — Марквардта).
+    residual_fn(x) -> r, jacobian_fn(x) -> J.
+    При constant_jacobian=True якобиан и J^T J считаются один раз.
+    stop — необязательный StoppingCriteria (бюджет времени и критерии сходимости;
+    шаги только уменьшают ||r||, поэтому при остановке x — лучшая точка).
+    trace — необязательный Trace (loss = ||r||^2 / n, step = ||delta||).
+    Возвращает (x, iterations).
+    """
+    if stop is None:
+        stop = StoppingCriteria()
+    x = np.array(x0, dtype=float)
+    r = residual_fn(x)
+    cost = float(r @ r)
+
+    jac = jacobian_fn(x)
+    jtj = jac.T @ jac
+
+    count = 0
+    while count < max_iters and not stop.expired(count):
+        count += 1
+
+        if not constant_jacobian and count > 1:
+            jac = jacobian_fn(x)
+            jtj = jac.T @ jac
+        grad = jac.T @ r
+
+        # шаги с увеличением демпфирования, пока ошибка не уменьшится
+        while True:
+            damped = jtj + lam * np.diag(np.diag(jtj))
+            try:
+                delta = np.linalg.solve(damped, -grad)
+            except np.linalg.LinAlgError:
+                delta = np.linalg.lstsq(damped, -grad, rcond=None)[0]
+
+            new_x = x + delta
+            new_r = residual_fn(new_x)
+            new_cost = float(new_r @ new_r)
+            if new_cost <= cost or lam > 1e12:
+                break
+            lam *= 10.0
+
+        if new_cost > cost:
+            break  # улучшение невозможно
+
+        step = np.linalg.norm(delta)
+        rel_change = (cost - new_cost) / max(cost, 1e-300)
+        prev_cost = cost
+        x, r, cost = new_x, new_r, new_cost
+        lam = max(lam / 10.0, 1e-12)
+        if trace is not None:
+            trace.record(cost / max(r.size, 1), x[0], x[1] if x.size > 1 else 0.0, step)
+
+        if step <= eps * (np.linalg.norm(x) + eps) or rel_change <= eps:
+            break
+        if stop.converged(cost, prev_cost, step):
+            break
+
+    return x, count
+
+
+def marquardt(tables, table_ind, *, initial_params=(10.0, 10.0), eps=1e-10, max_iters=100, lam=1e-3,
+              time_budget=None, stop=None, trace=None):
+    """
+    Метод Левенберга — Марквардта для g^E = RT * x1 * x2 * (a * x1 + b * x2).
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
+    Возвращает:
+    a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, average_op
+    """
+    start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
+
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
+    if not l_points:
+        return empty_result(trace)
+
+    params, count = levenberg_marquardt(
+        lambda p: residuals(p, problem),
+        lambda p: jacobian(p, problem),
+        initial_params,
+        constant_jacobian=True,
+        eps=eps,
+        max_iters=max_iters,
+        lam=lam,
+        stop=stop,
+        trace=trace,
+    )
+    a, b = float(params[0]), float(params[1])
+
+    result = make_result(problem, a, b, count, start_time, trace, stop.truncated)
+
+    print(f"Marquardt completed in {result.exec_time:.3f} seconds with {count} iterations")
+
+    return result
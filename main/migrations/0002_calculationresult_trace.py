@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="trace",
+            field=models.JSONField(blank=True, null=True, verbose_name="История сходимости"),
+        ),
+    ]
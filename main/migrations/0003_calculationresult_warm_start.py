@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0002_calculationresult_trace"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="warm_start",
+            field=models.JSONField(blank=True, null=True, verbose_name="Начальное приближение"),
+        ),
+    ]
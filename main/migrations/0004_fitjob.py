@@ -0,0 +1,37 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0003_calculationresult_warm_start"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FitJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("algorithm", models.CharField(max_length=50, verbose_name="Алгоритм (ключ реестра)")),
+                ("options", models.JSONField(blank=True, default=dict, verbose_name="Параметры запуска")),
+                ("status", models.CharField(choices=[("pending", "В очереди"), ("running", "Выполняется"), ("done", "Готово"), ("failed", "Ошибка")], default="pending", max_length=10, verbose_name="Статус")),
+                ("worker", models.CharField(blank=True, default="", max_length=100, verbose_name="Обработчик")),
+                ("response", models.JSONField(blank=True, null=True, verbose_name="Ответ")),
+                ("error", models.TextField(blank=True, default="", verbose_name="Ошибка")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("result", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="jobs", to="main.calculationresult")),
+                ("table", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="fit_jobs", to="main.table")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="fit_jobs", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "created_at"], name="main_fitjob_status_afa884_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0004_fitjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fitjob",
+            name="progress",
+            field=models.JSONField(blank=True, null=True, verbose_name="Прогресс"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0005_fitjob_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="truncated",
+            field=models.BooleanField(default=False, verbose_name="Остановлен по времени"),
+        ),
+    ]
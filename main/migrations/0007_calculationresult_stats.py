@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0006_calculationresult_truncated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="stats",
+            field=models.JSONField(blank=True, null=True, verbose_name="Статистика решателя"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0007_calculationresult_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="gradient_evaluations",
+            field=models.IntegerField(blank=True, null=True, verbose_name="Вычислений градиента"),
+        ),
+        migrations.AddField(
+            model_name="calculationresult",
+            name="loss_evaluations",
+            field=models.IntegerField(blank=True, null=True, verbose_name="Вычислений ошибки"),
+        ),
+        migrations.AddField(
+            model_name="calculationresult",
+            name="optimality_gap",
+            field=models.FloatField(blank=True, null=True, verbose_name="Зазор до оптимума МНК"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0008_calculationresult_evaluations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="bootstrap",
+            field=models.JSONField(blank=True, null=True, verbose_name="Доверительные интервалы"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_calculationresult_bootstrap"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calculationresult",
+            name="param_a_se",
+            field=models.FloatField(blank=True, null=True, verbose_name="Стандартная ошибка A12"),
+        ),
+        migrations.AddField(
+            model_name="calculationresult",
+            name="param_b_se",
+            field=models.FloatField(blank=True, null=True, verbose_name="Стандартная ошибка A21"),
+        ),
+        migrations.AddField(
+            model_name="calculationresult",
+            name="param_correlation",
+            field=models.FloatField(blank=True, null=True, verbose_name="Корреляция A12–A21"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_calculationresult_standard_errors"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fitjob",
+            name="attempts",
+            field=models.IntegerField(default=0, verbose_name="Попыток"),
+        ),
+    ]
@@ -57,6 +57,32 @@ class CalculationResult(models.Model):
     # сюда сохраняется копия данных таблицы
     table_data = models.TextField(null=True, blank=True, verbose_name="Данные таблицы")
 
+    # прореженная история сходимости: {'iteration': [...], 'loss': [...], 'a': [...], 'b': [...], 'step': [...]}
+    trace = models.JSONField(null=True, blank=True, verbose_name="История сходимости")
+
+    # начальное приближение при теплом старте: {'source': 'previous'|'analytic', 'result_id', 'a', 'b', 'loss'}
+    warm_start = models.JSONField(null=True, blank=True, verbose_name="Начальное приближение")
+
+    # расчет остановлен по бюджету времени: a, b — лучшее найденное решение
+    truncated = models.BooleanField(default=False, verbose_name="Остановлен по времени")
+
+    # статистика решателя (для отжига — доля принятых шагов, подогревы, температуры)
+    stats = models.JSONField(null=True, blank=True, verbose_name="Статистика решателя")
+
+    # стоимость и качество расчета: вычисления ошибки и градиента,
+    # относительный зазор до точного оптимума МНК (MSE - MSE*) / MSE*
+    loss_evaluations = models.IntegerField(null=True, blank=True, verbose_name="Вычислений ошибки")
+    gradient_evaluations = models.IntegerField(null=True, blank=True, verbose_name="Вычислений градиента")
+    optimality_gap = models.FloatField(null=True, blank=True, verbose_name="Зазор до оптимума МНК")
+
+    # бутстреп-интервалы: {'level', 'resamples', 'valid', 'a': [low, high], 'b': [low, high], 'a_std', 'b_std'}
+    bootstrap = models.JSONField(null=True, blank=True, verbose_name="Доверительные интервалы")
+
+    # стандартные ошибки a, b и корреляция a–b по якобиану остатков
+    param_a_se = models.FloatField(null=True, blank=True, verbose_name="Стандартная ошибка A12")
+    param_b_se = models.FloatField(null=True, blank=True, verbose_name="Стандартная ошибка A21")
+    param_correlation = models.FloatField(null=True, blank=True, verbose_name="Корреляция A12–A21")
+
     def get_table_data(self):
         """Возвращает JSON-данные таблицы (snapshot)."""
         if self.table_data:
@@ -70,6 +96,48 @@ class CalculationResult(models.Model):
         return f"Calculation #{self.id} by {self.user.username}"
 
 
+class FitJob(models.Model):
+    """Расчет в очереди: создается страницей расчетов, выполняется manage.py run_fit_workers."""
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Готово'),
+        ('failed', 'Ошибка'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="fit_jobs")
+    table = models.ForeignKey('Table', on_delete=models.SET_NULL, null=True, blank=True, related_name="fit_jobs")
+    algorithm = models.CharField(max_length=50, verbose_name="Алгоритм (ключ реестра)")
+    options = models.JSONField(default=dict, blank=True, verbose_name="Параметры запуска")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    worker = models.CharField(max_length=100, blank=True, default="", verbose_name="Обработчик")
+    # число захватов обработчиками (задание, зависшее в running, возвращается в очередь)
+    attempts = models.IntegerField(default=0, verbose_name="Попыток")
+    result = models.ForeignKey(
+        CalculationResult,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+    # последний прогресс решателя: {'iteration', 'loss', 'a', 'b', 'step'} (см. Trace.progress)
+    progress = models.JSONField(null=True, blank=True, verbose_name="Прогресс")
+    # JSON-ответ, как у синхронного calculations
+    response = models.JSONField(null=True, blank=True, verbose_name="Ответ")
+    error = models.TextField(blank=True, default="", verbose_name="Ошибка")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Job #{self.id} ({self.algorithm}, {self.status})"
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     avatar = models.ImageField(
@@ -0,0 +1,136 @@
+import time
+import numpy as np
+
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
+
+def coefficients(dim, adaptive=True):
+    """
+    Коэффициенты отражения, растяжения, сжатия и редукции симплекса.
+    adaptive=True — зависящие от размерности коэффициенты Гао — Хана
+    (1, 1 + 2/n, 0.75 - 1/(2n), 1 - 1/n); для n = 2 они совпадают с классическими.
+    """
+    if not adaptive or dim < 2:
+        return 1.0, 2.0, 0.5, 0.5
+    return 1.0, 1.0 + 2.0 / dim, 0.75 - 0.5 / dim, 1.0 - 1.0 / dim
+
+
+def simplex_minimize(loss_fn, x0, *, init_step=0.5, xtol=1e-8, ftol=1e-15, max_iters=2000, adaptive=True,
+                     stop=None, trace=None):
+    """
+    Метод Нелдера — Мида для loss_fn(x) -> float (без производных).
+    Начальный симплекс: x0 и x0 + init_step * e_i.
+    Остановка, когда и вершины (xtol), и значения (ftol) симплекса отличаются
+    от лучшей вершины не больше допусков.
+    stop — необязательный StoppingCriteria, trace — необязательный Trace
+    (лучшая вершина, шаг — размер симплекса).
+    Возвращает (x, f(x), iterations, counts), counts — число вычислений ошибки
+    и операций каждого типа.
+    """
+    if stop is None:
+        stop = StoppingCriteria()
+    x0 = np.asarray(x0, dtype=float)
+    dim = x0.size
+    alpha, beta, gamma, delta = coefficients(dim, adaptive)
+
+    simplex = np.vstack((x0, x0 + init_step * np.eye(dim)))
+    values = np.array([loss_fn(x) for x in simplex])
+    counts = {'evaluations': dim + 1, 'reflections': 0, 'expansions': 0, 'contractions': 0, 'shrinks': 0}
+
+    count = 0
+    while count < max_iters and not stop.expired(count):
+        order = np.argsort(values, kind='stable')
+        simplex, values = simplex[order], values[order]
+        size = float(np.max(np.abs(simplex[1:] - simplex[0])))
+        if size <= xtol and float(np.max(np.abs(values[1:] - values[0]))) <= ftol:
+            break
+        count += 1
+        prev_best = values[0]
+
+        centroid = simplex[:-1].mean(axis=0)
+        worst = simplex[-1]
+
+        reflected = centroid + alpha * (centroid - worst)
+        f_reflected = loss_fn(reflected)
+        counts['evaluations'] += 1
+
+        if f_reflected < values[0]:
+            # растяжение
+            expanded = centroid + beta * (reflected - centroid)
+            f_expanded = loss_fn(expanded)
+            counts['evaluations'] += 1
+            if f_expanded < f_reflected:
+                simplex[-1], values[-1] = expanded, f_expanded
+                counts['expansions'] += 1
+            else:
+                simplex[-1], values[-1] = reflected, f_reflected
+                counts['reflections'] += 1
+        elif f_reflected < values[-2]:
+            simplex[-1], values[-1] = reflected, f_reflected
+            counts['reflections'] += 1
+        else:
+            # сжатие: внешнее (к отраженной точке) или внутреннее (к худшей)
+            outside = f_reflected < values[-1]
+            target, f_target = (reflected, f_reflected) if outside else (worst, values[-1])
+            contracted = centroid + gamma * (target - centroid)
+            f_contracted = loss_fn(contracted)
+            counts['evaluations'] += 1
+            if f_contracted <= f_target:
+                simplex[-1], values[-1] = contracted, f_contracted
+                counts['contractions'] += 1
+            else:
+                # редукция к лучшей вершине
+                simplex[1:] = simplex[0] + delta * (simplex[1:] - simplex[0])
+                values[1:] = [loss_fn(x) for x in simplex[1:]]
+                counts['evaluations'] += dim
+                counts['shrinks'] += 1
+
+        best = int(np.argmin(values))
+        if trace is not None:
+            trace.record(values[best], simplex[best, 0], simplex[best, 1] if dim > 1 else 0.0, size)
+        # критерии — только по шагам, улучшившим лучшую вершину
+        if values[best] < prev_best and stop.converged(values[best], prev_best, size):
+            break
+
+    best = int(np.argmin(values))
+    return simplex[best], float(values[best]), count, counts
+
+
+def nelder_mead(tables, table_ind, *, initial_params=(1.0, 1.0), init_step=0.5, xtol=1e-8, ftol=1e-15,
+                max_iters=2000, adaptive=True, time_budget=None, stop=None, trace=None):
+    """
+    Метод Нелдера — Мида (симплекс без производных) для
+    g^E = RT * x1 * x2 * (a * x1 + b * x2).
+    initial_params — начальное приближение (a, b); init_step — размер начального симплекса.
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
+    Число вычислений ошибки и операций симплекса записывается в result.stats.
+    """
+    start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
+
+    problem = FitProblem.from_table(tables[table_ind])
+    if problem.n == 0:
+        return empty_result(trace)
+
+    params, _, count, counts = simplex_minimize(
+        lambda p: problem.mse(p[0], p[1]),
+        initial_params,
+        init_step=init_step,
+        xtol=xtol,
+        ftol=ftol,
+        max_iters=max_iters,
+        adaptive=adaptive,
+        stop=stop,
+        trace=trace,
+    )
+
+    result = make_result(problem, params[0], params[1], count, start_time, trace, stop.truncated)
+    result.stats = counts
+
+    print(f"Nelder_mead completed in {result.exec_time:.3f} seconds with {count} iterations "
+          f"({counts['evaluations']} evaluations)")
+
+    return result
@@ -1,81 +1,255 @@
+import math
 import random
 import time
 import numpy as np
 
-
-def func(a, b, x2, tables, table_ind):
-    """Модель: g^E = RT * x1 * x2 * (a * x1 + b * x2)."""
-    rt = tables[table_ind].temperature * 8.314462618
-    x1 = 1.0 - x2
-    return rt * x1 * x2 * (x1 * a + x2 * b)
-
-
-def sum_of_deviations(a, b, tables, table_ind, l_points):
-    """Среднеквадратичное отклонение (MSE)."""
-    x2 = np.array([p[0] for p in l_points])
-    gexp = np.array([p[1] for p in l_points])
-    gmod = func(a, b, x2, tables, table_ind)
-    return float(np.mean((gmod - gexp) ** 2))
-
-
-def otzhig(tables, table_ind, *, init_temp=5.0, cooling=0.995, eps=1e-7, max_iters=50000):
+from .fit_problem import FitProblem
+from .result import empty_result, make_result
+from .stopping import StoppingCriteria
+
+
+def otzhig(tables, table_ind, *, schedule='adaptive', init_temp=None, cooling=0.995, eps=1e-7, max_iters=50000,
+           init_step=1.0, t_ratio=1e-14, target_accept=0.44, window=100, patience=500, reheat=10.0,
+           max_reheats=5,
+           initial_params=None, seed=None, time_budget=None, stop=None, trace=None):
+    """
+    Метод имитации отжига.
+
+    schedule='fixed' — прежнее расписание: T от init_temp (по умолчанию 5.0)
+    умножается на cooling до eps, шаг предложения 0.5 * T.
+    schedule='adaptive' — адаптивное расписание:
+    - T0 подбирается по масштабу ошибки: средний прирост MSE при пробных шагах
+      init_step принимается с вероятностью 0.8 (init_temp задает T0 явно);
+    - T умножается на cooling до t_ratio * T0;
+    - шаг предложения раз в window итераций масштабируется по наблюдаемой
+      доле принятых шагов к target_accept;
+    - если patience итераций нет ни улучшения лучшей точки, ни принятых шагов
+      вверх (цепочка «замерзла»), поиск продолжается из лучшей точки
+      с температурой, увеличенной в reheat раз; после max_reheats подогревов
+      застой завершает расчет.
+
+    initial_params — начальное приближение (a, b); по умолчанию случайное из [0, 5].
+    seed — зерно генератора случайных чисел (воспроизводимый запуск).
+    time_budget, stop — см. StoppingCriteria.
+    trace — необязательный Trace для записи истории сходимости.
+    Статистика принятия шагов записывается в result.stats (температуры —
+    в исходных единицах MSE, шаг — пара (по a, по b) в исходных единицах параметров).
+    """
     start_time = time.time()
+    stop = StoppingCriteria.resolve(stop, time_budget)
+
+    if schedule not in ('fixed', 'adaptive'):
+        raise ValueError(f"Неизвестное расписание охлаждения: {schedule}")
 
-    l_points = [(p.x_value, p.y_value) for p in tables[table_ind].points.all()]
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
     if not l_points:
-        return 0.0, 0.0, 0, 0.0, [0.0, 1.0], [0, 0], [0, 0], [0, 0], [0, 0], 0.0
+        return empty_result(trace)
+
+    rng = random.Random(seed)
+    adaptive = schedule == 'adaptive'
 
     # стартовые параметры
-    a, b = random.uniform(0, 5), random.uniform(0, 5)
-    best_a, best_b = a, b
-    best_val = sum_of_deviations(a, b, tables, table_ind, l_points)
+    if initial_params is None:
+        a, b = rng.uniform(0, 5), rng.uniform(0, 5)
+    else:
+        a, b = float(initial_params[0]), float(initial_params[1])
+    val = problem.mse(a, b)
+    best_a, best_b, best_val = a, b, val
+
+    step = init_step
+    if not adaptive:
+        T = 5.0 if init_temp is None else init_temp
+        t_min = eps
+    else:
+        if init_temp is None:
+            # средний прирост ошибки при случайных шагах → T0 с вероятностью принятия 0.8
+            rises = [problem.mse(max(0, a + rng.gauss(0, step)), max(0, b + rng.gauss(0, step))) - val
+                     for _ in range(window)]
+            rises = [d for d in rises if d > 0]
+            init_temp = (sum(rises) / len(rises) if rises else max(abs(val), 1e-12)) / math.log(1 / 0.8)
+        T = init_temp
+        t_min = t_ratio * init_temp
 
-    T = init_temp
     count = 0
+    accepted = uphill = 0
+    window_accepted = 0
+    window_rate = 0.0
+    last_moved = 0  # последнее улучшение лучшей точки или принятый шаг вверх
+    reheats = 0
 
-    while T > eps and count < max_iters:
+    while T > t_min and count < max_iters and not stop.expired(count):
         count += 1
 
-        # случайный сосед (шаг уменьшается вместе с T)
-        new_a = max(0, a + random.gauss(0, 0.5 * T))
-        new_b = max(0, b + random.gauss(0, 0.5 * T))
+        # случайный сосед (фиксированное расписание: шаг уменьшается вместе с T)
+        sigma = step if adaptive else 0.5 * T
+        new_a = max(0, a + rng.gauss(0, sigma))
+        new_b = max(0, b + rng.gauss(0, sigma))
 
-        new_val = sum_of_deviations(new_a, new_b, tables, table_ind, l_points)
+        new_val = problem.mse(new_a, new_b)
 
         # вероятность принятия
-        delta = best_val - new_val
+        delta = val - new_val
         prob = np.exp(min(700, delta / T)) if delta < 0 else 1.0
 
-        if new_val < best_val or random.random() < prob:
-            a, b = new_a, new_b
-            best_val = new_val
-            best_a, best_b = a, b
+        if new_val < val or rng.random() < prob:
+            accepted += 1
+            window_accepted += 1
+            if new_val > val:
+                uphill += 1
+                last_moved = count
+            a, b, val = new_a, new_b, new_val
+            if val < best_val:
+                # критерии сходимости — только по улучшениям лучшей точки
+                # (шаги вверх и случайные блуждания текущего состояния не в счет)
+                moved = abs(a - best_a) + abs(b - best_b)
+                prev_best, best_a, best_b, best_val = best_val, a, b, val
+                last_moved = count
+                if stop.converged(best_val, prev_best, moved):
+                    break
+
+        if trace is not None:
+            trace.record(best_val, best_a, best_b, sigma)
 
         T *= cooling
 
-    # === Формирование данных для таблицы ===
-    l_x2, l_gmod, l_gexp, l_op, l_ap = [0.0], [0], [0], [0], [0]
-
-    for x2, gexp in l_points:
-        gmod = func(best_a, best_b, x2, tables, table_ind)
-        l_x2.append(x2)
-        l_gexp.append(gexp)
-        l_gmod.append(round(gmod))
-        if gexp != 0:
-            l_op.append(round(abs((gmod - gexp) / gexp * 100), 1))
-        else:
-            l_op.append(0)
-        l_ap.append(round(abs(gmod - gexp)))
-
-    l_x2.append(1.0)
-    l_gmod.append(0)
-    l_gexp.append(0)
-    l_op.append(0)
-    l_ap.append(0)
-
-    exec_time = time.time() - start_time
-    avg_op = round(sum(l_op) / len(l_op), 1)
-
-    print(f"Otzhig completed in {exec_time:.3f} seconds with {count} iterations")
+        if not adaptive:
+            continue
+
+        # подстройка шага под целевую долю принятых
+        if count % window == 0:
+            window_rate = window_accepted / window
+            step *= math.exp(window_rate - target_accept)
+            window_accepted = 0
+
+        # подогрев при застое: продолжаем из лучшей точки
+        if count - last_moved >= patience:
+            if reheats >= max_reheats:
+                break
+            reheats += 1
+            last_moved = count
+            a, b, val = best_a, best_b, best_val
+            T = min(init_temp, T * reheat)
+
+    result = make_result(problem, best_a, best_b, count, start_time, trace, stop.truncated)
+    final_step = step if adaptive else 0.5 * T
+    final_step_a, final_step_b = problem.to_original(final_step, final_step)
+    result.stats = {
+        'schedule': schedule,
+        'proposed': count,
+        'accepted': accepted,
+        'uphill_accepted': uphill,
+        'acceptance_rate': accepted / count if count else 0.0,
+        'last_window_rate': window_rate,
+        'reheats': reheats,
+        'init_temp': (init_temp if adaptive else (5.0 if init_temp is None else init_temp)) * problem.loss_scale,
+        'final_temp': T * problem.loss_scale,
+        'final_step': [float(final_step_a), float(final_step_b)],
+    }
+
+    print(f"Otzhig completed in {result.exec_time:.3f} seconds with {count} iterations "
+          f"(acceptance {result.stats['acceptance_rate']:.2f}, reheats {reheats})")
+
+    return result
+
+
+def otzhig_replica(tables, table_ind, *, n_chains=8, t_ratio=1e-6, final_scale=1e-12, init_step=1.0,
+                   swap_every=10, max_iters=400, target_accept=0.44, window=5, seed=None, block=1024,
+                   initial_params=None, time_budget=None, stop=None, trace=None):
+    """
+    Векторизованный отжиг с обменом реплик (parallel tempering).
+
+    n_chains цепочек с лестницей температур (геометрически от L0 до L0 * t_ratio,
+    где L0 — средняя начальная ошибка) двигаются одновременно как numpy-массивы.
+    Вся лестница охлаждается от 1 до final_scale за max_iters шагов.
+    Каждые swap_every шагов соседние по температуре цепочки обмениваются состояниями
+    (вместе с шагами предложения). Шаг каждой цепочки, как в otzhig, раз в window
+    итераций масштабируется по доле принятых шагов к target_accept.
+    Принятие шага проверяется относительно текущего состояния цепочки,
+    возвращается лучшее состояние по всем цепочкам.
+    Случайные числа генерируются блоками по block шагов.
+    initial_params — общая стартовая точка всех цепочек; по умолчанию случайные из [0, 5].
+    time_budget, stop — см. StoppingCriteria (проверяется только бюджет).
+    trace — необязательный Trace для записи истории сходимости (лучшее состояние
+    и шаг самой холодной цепочки).
+    """
+    start_time = time.time()
 
-    return best_a, best_b, count, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op
+    problem = FitProblem.from_table(tables[table_ind])
+    l_points = problem.points()
+    if not l_points:
+        return empty_result(trace)
+
+    stop = StoppingCriteria.resolve(stop, time_budget)
+    rng = np.random.default_rng(seed)
+
+    # стартовые параметры цепочек
+    if initial_params is None:
+        state = rng.uniform(0, 5, size=(n_chains, 2))
+    else:
+        state = np.tile(np.asarray(initial_params, dtype=float), (n_chains, 1))
+    energy = problem.batch_mse(state)
+
+    best_i = int(np.argmin(energy))
+    best_a, best_b = float(state[best_i, 0]), float(state[best_i, 1])
+    best_val = float(energy[best_i])
+
+    # лестница температур и начальные шаги
+    base_temp = max(float(np.mean(energy)), 1e-12)
+    temps = base_temp * np.geomspace(1.0, t_ratio, n_chains)
+    sigmas = init_step * np.sqrt(temps / temps[0])
+    cooling = final_scale ** (1.0 / max(max_iters, 1))
+    window_accepted = np.zeros(n_chains)
+
+    scale = 1.0
+    count = 0
+    while count < max_iters and not stop.expired(count):
+        k = count % block
+        if k == 0:
+            noise = rng.normal(size=(block, n_chains, 2))
+            uniforms = rng.random(size=(block, n_chains))
+        count += 1
+        T = temps * scale
+
+        # предложения для всех цепочек сразу
+        proposal = state + noise[k] * sigmas[:, None]
+        new_energy = problem.batch_mse(proposal)
+
+        # критерий Метрополиса относительно текущего состояния
+        delta = new_energy - energy
+        accept = (delta <= 0) | (uniforms[k] < np.exp(-np.maximum(delta, 0) / T))
+        state[accept] = proposal[accept]
+        energy[accept] = new_energy[accept]
+        window_accepted += accept
+
+        i = int(np.argmin(energy))
+        if energy[i] < best_val:
+            best_val = float(energy[i])
+            best_a, best_b = float(state[i, 0]), float(state[i, 1])
+
+        # подстройка шагов под целевую долю принятых
+        if count % window == 0:
+            sigmas *= np.exp(window_accepted / window - target_accept)
+            window_accepted[:] = 0
+
+        # обмен состояниями между соседними температурами (чередуем чет/нечет)
+        if n_chains > 1 and count % swap_every == 0:
+            lo = np.arange((count // swap_every) % 2, n_chains - 1, 2)
+            hi = lo + 1
+            log_ratio = (1.0 / T[lo] - 1.0 / T[hi]) * (energy[lo] - energy[hi])
+            swap = np.log(rng.random(lo.size)) < log_ratio
+            lo, hi = lo[swap], hi[swap]
+            state[lo], state[hi] = state[hi].copy(), state[lo].copy()
+            energy[lo], energy[hi] = energy[hi].copy(), energy[lo].copy()
+            sigmas[lo], sigmas[hi] = sigmas[hi].copy(), sigmas[lo].copy()
+
+        if trace is not None:
+            trace.record(best_val, best_a, best_b, float(sigmas[-1]))
+
+        scale *= cooling
+
+    result = make_result(problem, best_a, best_b, count, start_time, trace, stop.truncated)
+
+    print(f"Otzhig_replica completed in {result.exec_time:.3f} seconds with {count} iterations ({n_chains} chains)")
+
+    return result
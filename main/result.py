@@ -0,0 +1,106 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class SolverResult:
+    """
+    Результат решателя.
+
+    Поддерживает распаковку как прежний 10-кортеж:
+    a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, average_op = result
+
+    stats — необязательная статистика решателя (словарь, см. otzhig).
+    loss_evaluations, gradient_evaluations — число вычислений ошибки и градиента,
+    optimality_gap — относительный зазор до точного оптимума МНК
+    (см. FitProblem.optimality_gap).
+    bootstrap — бутстреп-интервалы a и b (см. bootstrap.bootstrap_intervals).
+    a_se, b_se, correlation — стандартные ошибки a, b и корреляция a–b
+    по якобиану остатков (см. FitProblem.standard_errors).
+    """
+    a: float
+    b: float
+    iterations: int
+    exec_time: float
+    l_x2: list
+    l_gmod: list
+    l_gexp: list
+    l_op: list
+    l_ap: list
+    average_op: float
+    trace: object = None
+    seed: object = None
+    cached: bool = False
+    truncated: bool = False
+    stats: object = None
+    loss_evaluations: int = 0
+    gradient_evaluations: int = 0
+    optimality_gap: float = None
+    bootstrap: object = None
+    a_se: float = None
+    b_se: float = None
+    correlation: float = None
+
+    def __iter__(self):
+        return iter((
+            self.a, self.b, self.iterations, self.exec_time,
+            self.l_x2, self.l_gmod, self.l_gexp, self.l_op, self.l_ap, self.average_op,
+        ))
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __len__(self):
+        return 10
+
+    def table_data(self):
+        """Строки таблицы результатов (x2, gmod, gexp, sigma, delta)."""
+        return [
+            {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
+            for x2, gmod, gexp, op, ap in zip(self.l_x2, self.l_gmod, self.l_gexp, self.l_op, self.l_ap)
+        ]
+
+    def trace_data(self):
+        """История сходимости в виде словаря (или None)."""
+        return self.trace.to_dict() if self.trace is not None else None
+
+
+def empty_result(trace=None):
+    """Результат для пустой таблицы."""
+    return SolverResult(0.0, 0.0, 0, 0.0, [0.0, 1.0], [0, 0], [0, 0], [0, 0], [0, 0], 0.0, trace)
+
+
+def make_result(problem, a, b, count, start_time, trace=None, truncated=False):
+    """
+    Формирование таблицы результатов (с граничными точками x2 = 0 и x2 = 1)
+    и средней относительной погрешности для найденных a, b.
+    truncated — расчет остановлен по бюджету времени (a, b — лучшее найденное).
+    Число вычислений ошибки и градиента берется из счетчиков problem,
+    стандартные ошибки и корреляция a–b считаются в точке (a, b).
+    """
+    a, b = float(a), float(b)
+    gmod = problem.model(a, b)
+    gexp = problem.gexp
+    deltas = np.abs(gmod - gexp)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigmas = np.where(gexp != 0, deltas / np.abs(gexp) * 100.0, 0.0)
+
+    l_x2 = [0.0] + problem.x2.tolist() + [1.0]
+    l_gexp = [0] + gexp.tolist() + [0]
+    l_gmod = [0] + [round(v) for v in gmod.tolist()] + [0]
+    l_op = [0] + [round(v, 1) for v in sigmas.tolist()] + [0]
+    l_ap = [0] + [round(v) for v in deltas.tolist()] + [0]
+
+    a_se, b_se, correlation = problem.standard_errors(a, b) or (None, None, None)
+
+    exec_time = time.time() - start_time
+    avg_op = round(sum(l_op) / len(l_op), 1)
+
+    return SolverResult(a, b, int(count), exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op, trace,
+                        truncated=truncated,
+                        loss_evaluations=int(problem.loss_evaluations),
+                        gradient_evaluations=int(problem.gradient_evaluations),
+                        optimality_gap=problem.optimality_gap(a, b),
+                        a_se=a_se, b_se=b_se, correlation=correlation)
@@ -0,0 +1,212 @@
+import json
+import time
+from dataclasses import dataclass, field
+
+from .bootstrap import bootstrap_intervals
+from . import (analytic, bfgs, evolution, fit_cache, gauss, gauss_step, gradient, gradient_step, marquardt,
+               nelder_mead, otzhig)
+from .fit_problem import FitProblem
+from .result import make_result
+from .warm_start import warm_start
+
+
+@dataclass(frozen=True, slots=True)
+class SolverSpec:
+    """
+    Описание алгоритма в реестре: ключ, название для пользователя, функция и ее параметры.
+    seedable — итерационный метод: принимает initial_params (теплый старт)
+    и time_budget (см. stopping.StoppingCriteria).
+    deterministic — одинаковые данные и параметры дают одинаковый результат
+    (стохастические методы детерминированы только при заданном seed).
+    scaled — решатель работает с обезразмеренной задачей (FitProblem.scaled).
+    """
+    key: str
+    label: str
+    func: object
+    options: dict = field(default_factory=dict)
+    seedable: bool = True
+    deterministic: bool = True
+    scaled: bool = True
+
+    def is_deterministic(self, options):
+        """Воспроизводим ли запуск с параметрами options."""
+        return self.deterministic or {**self.options, **options}.get('seed') is not None
+
+    def run(self, tables, table_ind, *, trace=None, **options):
+        """
+        Запуск решателя; options дополняют/переопределяют параметры по умолчанию.
+        При scaled решатель получает обезразмеренную задачу: переданные
+        initial_params (в исходных единицах) переводятся в ее единицы
+        (приближение по умолчанию задано в единицах решателя), а найденные a, b,
+        история сходимости и таблица результатов — обратно в исходные.
+        """
+        kwargs = dict(self.options)
+        kwargs.update(options)
+        if not self.scaled:
+            return self.func(tables, table_ind, trace=trace, **kwargs)
+
+        start_time = time.time()
+        problem = FitProblem.from_table(tables[table_ind])
+        if problem.n == 0:
+            return self.func([problem], 0, trace=trace, **kwargs)
+
+        scaled = problem.scaled()
+        initial = kwargs.get('initial_params')
+        if self.seedable and initial is not None:
+            kwargs['initial_params'] = scaled.to_scaled(float(initial[0]), float(initial[1]))
+        if trace is not None:
+            trace.scale = (scaled.loss_scale, *scaled.scale[1:])
+
+        result = self.func([scaled], 0, trace=trace, **kwargs)
+        a, b = scaled.to_original(result.a, result.b)
+        original = make_result(problem, a, b, result.iterations, start_time, trace, result.truncated)
+        # статистику решатели сами приводят к исходным единицам (loss_scale, to_original)
+        original.stats = result.stats
+        original.loss_evaluations = result.loss_evaluations
+        original.gradient_evaluations = result.gradient_evaluations
+        return original
+
+
+SOLVERS = {}
+
+
+def register(key, label, func, *, seedable=True, deterministic=True, scaled=True, **options):
+    """Регистрирует алгоритм под ключом key (значение поля algorithm в форме)."""
+    SOLVERS[key] = SolverSpec(key, label, func, options, seedable, deterministic, scaled)
+    return SOLVERS[key]
+
+
+def get_solver(key):
+    """Алгоритм по ключу; ValueError, если такого нет."""
+    try:
+        return SOLVERS[key]
+    except KeyError:
+        raise ValueError(f"Неизвестный алгоритм: {key}") from None
+
+
+# допуски eps заданы для обезразмеренной задачи (|g'| <= 1, диагональ гессиана 2)
+register('gauss', 'Метод Гаусса', gauss.gauss, eps=1e-12)
+register('gauss_exact', 'Метод Гаусса (точный шаг)', gauss.gauss, exact=True, eps=1e-14)
+register('gauss_step', 'Метод Гаусса с переменным шагом', gauss_step.gauss_step)
+register('gradient', 'Метод градиентного спуска', gradient.gradient, eps=1e-8)
+register('gradient_step', 'Метод градиентного спуска с переменным шагом', gradient_step.gradient_step, eps=1e-8)
+register('bfgs', 'Метод BFGS', bfgs.bfgs, eps=1e-8)
+register('gradient_multistart', 'Метод градиентного спуска из нескольких стартов', gradient.gradient_multistart,
+         deterministic=False, eps=1e-8)
+register('nelder_mead', 'Метод Нелдера — Мида', nelder_mead.nelder_mead)
+register('marquardt', 'Метод Левенберга — Марквардта', marquardt.marquardt)
+register('otzhig', 'Метод симуляции отжига', otzhig.otzhig, deterministic=False)
+register('otzhig_replica', 'Метод отжига с обменом реплик', otzhig.otzhig_replica, deterministic=False)
+register('evolution', 'Метод дифференциальной эволюции', evolution.evolution, deterministic=False)
+register('analytic', 'Аналитическое решение (МНК)', analytic.analytic, seedable=False, scaled=False)
+
+
+def run_solver(spec, tables, table_ind, *, warm=None, trace=None, options=None, use_cache=True,
+               time_budget=None, bootstrap=None):
+    """
+    Запуск алгоритма из реестра.
+    warm — источник теплого старта ('previous' или 'analytic', см. warm_start)
+    или None для начального приближения по умолчанию.
+    Использованное приближение записывается в result.seed.
+    options — дополнительные параметры решателя (например, seed для отжига).
+    Результаты воспроизводимых запусков кэшируются по содержимому задачи
+    (см. fit_cache); при попадании в кэш result.cached = True.
+    time_budget — бюджет времени (сек) итерационного метода; при его истечении
+    возвращается лучшее найденное решение с result.truncated = True.
+    Бюджет не входит в ключ кэша, а прерванные расчеты не кэшируются.
+    bootstrap — число бутстреп-выборок для доверительных интервалов a и b
+    (result.bootstrap); интервалы считаются и при попадании в кэш.
+    """
+    start_time = time.time()
+    table = tables[table_ind]
+    problem = FitProblem.from_table(table)
+
+    kwargs = dict(options or {})
+    seed = None
+    if warm and spec.seedable:
+        kwargs['initial_params'], seed = warm_start(table, problem, warm)
+
+    key = None
+    if use_cache and spec.is_deterministic(kwargs):
+        key = fit_cache.fit_key(problem, spec.key, {**spec.options, **kwargs})
+        result = fit_cache.lookup(key)
+        if result is not None:
+            result.cached = True
+            result.exec_time = time.time() - start_time
+            result.seed = seed
+            if bootstrap:
+                result.bootstrap = bootstrap_intervals(problem, resamples=bootstrap)
+            return result
+
+    if time_budget is not None and spec.seedable:
+        kwargs['time_budget'] = time_budget
+    result = spec.run([problem], 0, trace=trace, **kwargs)
+    result.seed = seed
+    if key is not None and not result.truncated:
+        fit_cache.store(key, result)
+    if bootstrap:
+        result.bootstrap = bootstrap_intervals(problem, resamples=bootstrap)
+    return result
+
+
+def build_result(spec, result, *, user, table, table_data=None):
+    """Несохраненный CalculationResult для результата решателя (для save/bulk_create)."""
+    from .models import CalculationResult
+
+    if table_data is None:
+        table_data = result.table_data()
+    return CalculationResult(
+        user=user,
+        title=table.title,
+        algorithm=spec.label,
+        param_a=result.a,
+        param_b=result.b,
+        table=table,
+        iterations=result.iterations or 0,
+        average_op=result.average_op,
+        exec_time=result.exec_time,
+        table_data=json.dumps(table_data),
+        trace=result.trace_data(),
+        warm_start=result.seed,
+        truncated=result.truncated,
+        stats=result.stats,
+        loss_evaluations=result.loss_evaluations,
+        gradient_evaluations=result.gradient_evaluations,
+        optimality_gap=result.optimality_gap,
+        bootstrap=result.bootstrap,
+        param_a_se=result.a_se,
+        param_b_se=result.b_se,
+        param_correlation=result.correlation,
+    )
+
+
+def save_result(spec, result, *, user, table):
+    """
+    Сохраняет CalculationResult для результата решателя.
+    Возвращает (запись, данные для JSON-ответа).
+    """
+    table_data = result.table_data()
+    calculation = build_result(spec, result, user=user, table=table, table_data=table_data)
+    calculation.save()
+    trace = calculation.trace
+    payload = {
+        'a': round(result.a, 3),
+        'b': round(result.b, 3),
+        'iterations': result.iterations or 'N/A',
+        'exec_time': f"{result.exec_time:.3f} сек" if result.exec_time else 'N/A',
+        'table_data': table_data,
+        'trace': trace,
+        'warm_start': result.seed,
+        'cached': result.cached,
+        'truncated': result.truncated,
+        'stats': result.stats,
+        'loss_evaluations': result.loss_evaluations,
+        'gradient_evaluations': result.gradient_evaluations,
+        'optimality_gap': result.optimality_gap,
+        'bootstrap': result.bootstrap,
+        'a_se': result.a_se,
+        'b_se': result.b_se,
+        'correlation': result.correlation,
+        'result_id': calculation.id,
+    }
+    return calculation, payload
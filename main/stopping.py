@@ -0,0 +1,88 @@
+import math
+import time
+
+import numpy as np
+
+
+class StoppingCriteria:
+    """
+    Общие критерии остановки итерационных решателей.
+
+    time_budget — бюджет времени в секундах (None — без ограничения);
+    rtol — относительное изменение MSE за итерацию, xtol — норма изменения
+    параметров, gtol — норма градиента. Критерий со значением None не проверяется,
+    сходимость — выполнение любого из заданных критериев.
+    rtol и xtol проверяются только на шагах, уменьшивших MSE (loss < prev_loss):
+    отвергнутый или не улучшивший шаг (нулевое изменение) не означает сходимости.
+    Часы опрашиваются раз в check_every итераций; truncated становится True,
+    когда решатель остановлен по истечении бюджета. Решатели спуска принимают
+    только шаги, уменьшающие MSE, поэтому при остановке их текущая точка —
+    лучшая найденная; стохастические решатели возвращают лучшую из посещенных.
+    """
+
+    __slots__ = ('time_budget', 'rtol', 'xtol', 'gtol', 'check_every', 'deadline', 'truncated')
+
+    def __init__(self, *, time_budget=None, rtol=None, xtol=None, gtol=None, check_every=16):
+        self.time_budget = time_budget
+        self.rtol = rtol
+        self.xtol = xtol
+        self.gtol = gtol
+        self.check_every = max(1, int(check_every))
+        self.deadline = None
+        self.truncated = False
+
+    @classmethod
+    def resolve(cls, stop=None, time_budget=None):
+        """
+        Критерии для одного запуска решателя: копия stop (или пустые критерии)
+        с бюджетом time_budget, если он задан; отсчет времени начинается сейчас.
+        """
+        criteria = cls() if stop is None else cls(
+            time_budget=stop.time_budget, rtol=stop.rtol, xtol=stop.xtol, gtol=stop.gtol,
+            check_every=stop.check_every)
+        if time_budget is not None:
+            criteria.time_budget = time_budget
+        if criteria.time_budget is not None:
+            criteria.deadline = time.monotonic() + criteria.time_budget
+        return criteria
+
+    def expired(self, iteration):
+        """Истек ли бюджет времени (проверяется раз в check_every итераций)."""
+        if (self.deadline is not None
+                and iteration % self.check_every == 0
+                and time.monotonic() >= self.deadline):
+            self.truncated = True
+        return self.truncated
+
+    def converged(self, loss=None, prev_loss=None, step=None, grad_norm=None):
+        """
+        Выполнен ли хотя бы один из заданных критериев сходимости.
+        Если переданы loss и prev_loss, rtol и xtol проверяются только при loss < prev_loss.
+        """
+        improved = loss is None or prev_loss is None or loss < prev_loss
+        if self.rtol is not None and loss is not None and prev_loss is not None and improved:
+            if prev_loss - loss <= self.rtol * max(abs(prev_loss), 1e-300):
+                return True
+        if self.xtol is not None and step is not None and improved and step <= self.xtol:
+            return True
+        if self.gtol is not None and grad_norm is not None and grad_norm <= self.gtol:
+            return True
+        return False
+
+    def converged_rows(self, loss, prev_loss, step, grad_norm):
+        """Векторный вариант converged для пакетных решателей: булев массив по строкам."""
+        mask = np.zeros(np.shape(loss), dtype=bool)
+        improved = loss < prev_loss
+        if self.rtol is not None:
+            mask |= improved & (prev_loss - loss <= self.rtol * np.maximum(np.abs(prev_loss), 1e-300))
+        if self.xtol is not None:
+            mask |= improved & (step <= self.xtol)
+        if self.gtol is not None:
+            mask |= grad_norm <= self.gtol
+        return mask
+
+    def remaining(self):
+        """Оставшееся время (сек) или inf без бюджета."""
+        if self.deadline is None:
+            return math.inf
+        return max(0.0, self.deadline - time.monotonic())
@@ -1,11 +1,27 @@
 """
-Тесты для алгоритмов оптимизации (gauss, gauss_step, gradient, gradient_step, otzhig)
+Тесты для алгоритмов оптимизации (gauss, gauss_step, gradient, gradient_step, otzhig, analytic, marquardt)
 """
+import pickle
 import unittest
-from django.test import TestCase
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
-from main.models import Table, Point
-from main import gauss, gauss_step, gradient, gradient_step, otzhig
+from main.models import Table, Point, CalculationResult
+from main import (analytic, bfgs, bootstrap, evolution, fit_cache, gauss, gauss_step, gradient, gradient_step,
+                  marquardt, nelder_mead, otzhig)
+from main.fit_problem import FitProblem, evaluate_batch
+from main.trace import Trace
+from main.result import SolverResult
+from main.solvers import SOLVERS, get_solver, run_solver, save_result
+from main.stopping import StoppingCriteria
+from main.warm_start import warm_start
+from main import compare
+from main.compare import COMPARE_ALGORITHMS, compare_all, save_all
+from main.batch import load_problems
 import numpy as np
 
 
@@ -116,6 +132,17 @@ class GaussAlgorithmTest(AlgorithmTestCase):
         )
         self.assertAlgorithmResults(result, "Метод Гаусса (custom)")
 
+    def test_gauss_exact_step(self):
+        """Точная минимизация по координате сходится за десятки итераций"""
+        result = gauss.gauss(self.tables, self.table_ind, exact=True)
+        self.assertAlgorithmResults(result, "Метод Гаусса (точный шаг)")
+
+        a, b, iterations, *_ = result
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertLess(iterations, 100)
+        self.assertAlmostEqual(a, a_opt, places=4)
+        self.assertAlmostEqual(b, b_opt, places=4)
+
     def test_gauss_empty_table(self):
         """Тест метода Гаусса с пустой таблицей"""
         empty_table = Table.objects.create(
@@ -205,6 +232,43 @@ class GradientAlgorithmTest(AlgorithmTestCase):
         self.assertEqual(a, 0.0)
         self.assertEqual(b, 0.0)
 
+    def test_gradient_multistart(self):
+        """Мультистарт находит оптимум и возвращает статистику бассейнов"""
+        result = gradient.gradient_multistart(self.tables, self.table_ind, n_starts=32, seed=0)
+        self.assertAlgorithmResults(result, "Градиентный спуск (мультистарт)")
+
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertAlmostEqual(result.a, a_opt, places=4)
+        self.assertAlmostEqual(result.b, b_opt, places=4)
+
+        stats = result.stats
+        self.assertEqual(stats['n_starts'], 32)
+        self.assertEqual(sum(basin['count'] for basin in stats['basins']), 32)
+        self.assertEqual(stats['n_basins'], 1)  # задача выпуклая
+        self.assertEqual(stats['best_basin_share'], 1.0)
+        self.assertLessEqual(stats['iterations_max'], result.iterations)
+
+    def test_gradient_multistart_matches_single(self):
+        """Строка мультистарта проходит ту же траекторию, что и одиночный спуск"""
+        single = gradient.gradient(self.tables, self.table_ind, initial_params=(5.0, 5.0))
+        multi = gradient.gradient_multistart(self.tables, self.table_ind, n_starts=1, initial_params=(5.0, 5.0))
+        self.assertAlmostEqual(multi.a, single.a, places=6)
+        self.assertAlmostEqual(multi.b, single.b, places=6)
+        self.assertEqual(multi.stats['iterations_max'], single.iterations - 1)
+
+    def test_gradient_multistart_seed_reproducible(self):
+        """Одинаковый seed дает одинаковый результат"""
+        first = gradient.gradient_multistart(self.tables, self.table_ind, seed=5)
+        second = gradient.gradient_multistart(self.tables, self.table_ind, seed=5)
+        self.assertEqual((first.a, first.b, first.stats), (second.a, second.b, second.stats))
+
+    def test_basin_stats(self):
+        """Конечные точки группируются по бассейнам по возрастанию ошибки"""
+        points = np.array([[1.0, 1.0], [3.0, 3.0], [1.0 + 1e-5, 1.0], [3.0, 3.0 - 1e-5]])
+        losses = np.array([2.0, 1.0, 2.0, 1.0])
+        basins = gradient.basin_stats(points, losses)
+        self.assertEqual([(b['a'], b['count']) for b in basins], [(3.0, 2), (1.0, 2)])
+
 
 class GradientStepAlgorithmTest(AlgorithmTestCase):
     """Тесты для метода градиентного спуска с переменным шагом"""
@@ -283,6 +347,409 @@ class OtzhigAlgorithmTest(AlgorithmTestCase):
         self.assertEqual(b, 0.0)
 
 
+    def test_otzhig_acceptance_stats(self):
+        """Адаптивное расписание возвращает статистику принятия шагов"""
+        result = otzhig.otzhig(self.tables, self.table_ind, seed=0)
+        stats = result.stats
+        self.assertEqual(stats['schedule'], 'adaptive')
+        self.assertEqual(stats['proposed'], result.iterations)
+        self.assertLessEqual(stats['uphill_accepted'], stats['accepted'])
+        self.assertAlmostEqual(stats['acceptance_rate'], stats['accepted'] / stats['proposed'])
+        self.assertGreater(stats['init_temp'], stats['final_temp'])
+
+    def test_otzhig_stats_original_units(self):
+        """Из реестра температуры и шаг в статистике — в исходных единицах, как a и b"""
+        problem = FitProblem.from_table(self.table)
+        scaled = problem.scaled()
+        registry = get_solver('otzhig').run([problem], 0, seed=5).stats
+        direct = otzhig.otzhig([scaled], 0, seed=5).stats
+        self.assertAlmostEqual(registry['final_temp'], direct['final_temp'])
+        np.testing.assert_allclose(registry['final_step'], direct['final_step'])
+
+        step = direct['final_step'][0] / scaled.scale[1]
+        np.testing.assert_allclose(registry['final_step'], scaled.to_original(step, step))
+        self.assertNotAlmostEqual(registry['final_step'][0], registry['final_step'][1])
+
+    def test_otzhig_adaptive_loss_scale(self):
+        """Адаптивное расписание находит оптимум при любом масштабе ошибки, фиксированное — нет"""
+        x2, gexp = zip(*test_data)
+        problem = FitProblem(x2, np.array(gexp) * 100.0, self.table.temperature)
+        a_opt, b_opt = problem.optimum()
+
+        result = otzhig.otzhig([problem], 0, seed=1)
+        self.assertAlmostEqual(result.a, a_opt, places=3)
+        self.assertAlmostEqual(result.b, b_opt, places=3)
+
+        fixed = otzhig.otzhig([problem], 0, schedule='fixed', seed=1)
+        self.assertGreater(problem.mse(fixed.a, fixed.b), 2 * problem.mse(a_opt, b_opt))
+
+    def test_otzhig_reheats(self):
+        """При застое отжиг подогревается из лучшей точки не более max_reheats раз"""
+        result = otzhig.otzhig(self.tables, self.table_ind, seed=2, patience=20, max_reheats=3)
+        self.assertEqual(result.stats['reheats'], 3)
+
+        problem = FitProblem.from_table(self.table)
+        self.assertLess(problem.mse(result.a, result.b), problem.mse(5.0, 5.0))
+
+    def test_otzhig_unknown_schedule(self):
+        """Неизвестное расписание — ValueError"""
+        with self.assertRaises(ValueError):
+            otzhig.otzhig(self.tables, self.table_ind, schedule='linear')
+
+class OtzhigReplicaAlgorithmTest(AlgorithmTestCase):
+    """Тесты для отжига с обменом реплик"""
+
+    def test_otzhig_replica_basic(self):
+        """Базовый тест отжига с обменом реплик"""
+        result = otzhig.otzhig_replica(self.tables, self.table_ind, seed=1)
+        self.assertAlgorithmResults(result, "Отжиг с обменом реплик")
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertLess(avg_op, 50, "Средняя погрешность слишком велика")
+
+    def test_otzhig_replica_finds_optimum(self):
+        """Лучшее состояние по всем цепочкам близко к точному оптимуму"""
+        a, b, *_ = otzhig.otzhig_replica(self.tables, self.table_ind, seed=2)
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertAlmostEqual(a, a_opt, places=3)
+        self.assertAlmostEqual(b, b_opt, places=3)
+
+    def test_otzhig_replica_optimality_gap(self):
+        """Шаги цепочек подстраиваются по доле принятых: точность не хуже otzhig при меньшем числе вычислений"""
+        problem = FitProblem.from_table(self.table)
+        for seed in range(3):
+            replica = get_solver('otzhig_replica').run([problem], 0, seed=seed)
+            scalar = get_solver('otzhig').run([problem], 0, seed=seed)
+            self.assertLess(replica.optimality_gap, max(10 * scalar.optimality_gap, 1e-9), seed)
+            self.assertLess(replica.loss_evaluations, scalar.loss_evaluations, seed)
+
+    def test_otzhig_replica_seed_reproducible(self):
+        """Одинаковый seed — одинаковый результат"""
+        first = otzhig.otzhig_replica(self.tables, self.table_ind, seed=3, max_iters=500)
+        second = otzhig.otzhig_replica(self.tables, self.table_ind, seed=3, max_iters=500)
+        self.assertEqual(first[:3], second[:3])
+
+    def test_otzhig_replica_single_chain(self):
+        """Одна цепочка (без обменов)"""
+        result = otzhig.otzhig_replica(self.tables, self.table_ind, n_chains=1, seed=4, max_iters=500)
+        self.assertAlgorithmResults(result, "Отжиг с обменом реплик (1 цепочка)")
+
+    def test_otzhig_replica_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(
+            title="Empty Table",
+            temperature=298.15,
+            author=self.user
+        )
+        result = otzhig.otzhig_replica([empty_table], 0)
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertEqual(a, 0.0)
+        self.assertEqual(b, 0.0)
+
+
+class EvolutionAlgorithmTest(AlgorithmTestCase):
+    """Тесты для дифференциальной эволюции"""
+
+    def test_evolution_basic(self):
+        """Дифференциальная эволюция находит оптимум МНК"""
+        result = evolution.evolution(self.tables, self.table_ind, seed=0)
+        self.assertAlgorithmResults(result, "Дифференциальная эволюция")
+
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertAlmostEqual(result.a, a_opt, places=4)
+        self.assertAlmostEqual(result.b, b_opt, places=4)
+        self.assertEqual(result.stats['generations'], result.iterations)
+        self.assertEqual(result.stats['evaluations'], 20 * (result.iterations + 1))
+
+    def test_evolution_negative_parameters(self):
+        """Поиск не ограничен неотрицательными параметрами (в отличие от отжига)"""
+        x2, gexp = zip(*test_data)
+        problem = FitProblem(x2, -0.3 * np.array(gexp), 320.0)
+        result = get_solver('evolution').run([problem], 0, seed=1)
+        a_opt, b_opt = problem.optimum()
+        self.assertLess(a_opt, 0)
+        self.assertAlmostEqual(result.a, a_opt, places=4)
+        self.assertAlmostEqual(result.b, b_opt, places=4)
+
+    def test_evolution_one_batch_per_generation(self):
+        """Ошибка пробных векторов считается одним пакетным вызовом за поколение"""
+        problem = FitProblem.from_table(self.table)
+        with mock.patch.object(problem, 'batch_mse', wraps=problem.batch_mse) as batch_mse:
+            result = evolution.evolution([problem], 0, seed=2)
+        self.assertEqual(batch_mse.call_count, result.iterations + 1)
+
+    def test_evolution_seed_reproducible(self):
+        """Одинаковый seed дает одинаковый результат"""
+        first = evolution.evolution(self.tables, self.table_ind, seed=3, max_iters=50)
+        second = evolution.evolution(self.tables, self.table_ind, seed=3, max_iters=50)
+        self.assertEqual((first.a, first.b, first.stats), (second.a, second.b, second.stats))
+
+    def test_stopping_criteria_keep_optimality_gap(self):
+        """Критерии сравнивают лучшую особь с окном из stall поколений, а не с одним неудачным поколением"""
+        problem = FitProblem.from_table(self.table)
+        for seed in range(3):
+            for criteria in ({'xtol': 1e-9}, {'rtol': 1e-12}):
+                result = get_solver('evolution').run([problem], 0, seed=seed, stop=StoppingCriteria(**criteria))
+                self.assertLess(result.optimality_gap, 1e-8, (seed, criteria))
+                self.assertGreater(result.iterations, 10, (seed, criteria))
+
+    def test_evolution_degenerate_tables(self):
+        """На вырожденных таблицах пробные векторы остаются в области поиска, а не уходят вдоль долины"""
+        for x2, gexp in (([0.5], [100.0]), ([0.3] * 5, [50.0, 52.0, 49.0, 51.0, 50.0])):
+            problem = FitProblem(x2, gexp, 300.0)
+            for seed in range(3):
+                result = get_solver('evolution').run([problem], 0, seed=seed)
+                a, b = problem.scaled().to_scaled(result.a, result.b)
+                self.assertLessEqual(max(abs(a), abs(b)), 5.0, (x2, seed))
+                self.assertLess(result.optimality_gap, 1e-2, (x2, seed))
+
+    def test_evolution_exact_fit_stops(self):
+        """Для данных без ошибки (MSE* = 0) срабатывает абсолютный допуск, а не max_iters"""
+        x2 = np.linspace(0.1, 0.9, 9)
+        rt = 300.0 * 8.314462618
+        for gexp in (np.zeros(9), rt * (1 - x2) * x2 * (1.2 * (1 - x2) + 0.7 * x2)):
+            problem = FitProblem(x2, gexp, 300.0)
+            result = get_solver('evolution').run([problem], 0, seed=0)
+            self.assertLess(result.iterations, 1000)
+            self.assertLess(result.optimality_gap, 1e-6)
+
+    def test_pick_donors_distinct(self):
+        """Доноры мутации различны и не совпадают с самой особью"""
+        donors = evolution.pick_donors(np.random.default_rng(0), 6)
+        self.assertEqual(donors.shape, (6, 3))
+        for i, row in enumerate(donors):
+            self.assertEqual(len(set(row.tolist()) | {i}), 4)
+
+    def test_evolution_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(title="Empty Table", temperature=298.15, author=self.user)
+        result = evolution.evolution([empty_table], 0)
+        self.assertEqual((result.a, result.b), (0.0, 0.0))
+
+class NelderMeadAlgorithmTest(AlgorithmTestCase):
+    """Тесты для метода Нелдера — Мида"""
+
+    def test_nelder_mead_basic(self):
+        """Симплекс находит оптимум МНК"""
+        result = nelder_mead.nelder_mead(self.tables, self.table_ind, initial_params=(5.0, 5.0), init_step=1.0)
+        self.assertAlgorithmResults(result, "Метод Нелдера — Мида")
+
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertAlmostEqual(result.a, a_opt, places=4)
+        self.assertAlmostEqual(result.b, b_opt, places=4)
+
+    def test_fewer_evaluations_than_gauss_step(self):
+        """Из реестра симплекс тратит на порядок меньше вычислений ошибки, чем gauss_step"""
+        problem = FitProblem.from_table(self.table)
+        evaluations = {}
+        for key in ('gauss_step', 'nelder_mead'):
+            scaled = problem.scaled()
+            with mock.patch.object(FitProblem, 'scaled', return_value=scaled), \
+                    mock.patch.object(scaled, 'mse', wraps=scaled.mse) as mse:
+                result = get_solver(key).run([problem], 0)
+            evaluations[key] = mse.call_count
+            if key == 'nelder_mead':
+                self.assertEqual(result.stats['evaluations'], mse.call_count)
+                self.assertLess(problem.mse(result.a, result.b) - problem.min_loss, 1e-9 * problem.min_loss)
+        self.assertLess(evaluations['nelder_mead'] * 10, evaluations['gauss_step'])
+
+    def test_simplex_minimize_nonlinear(self):
+        """Симплекс без производных минимизирует нелинейную функцию (Розенброк)"""
+        rosenbrock = lambda p: (1.0 - p[0]) ** 2 + 100.0 * (p[1] - p[0] ** 2) ** 2
+        x, value, iterations, counts = nelder_mead.simplex_minimize(rosenbrock, (-1.2, 1.0), xtol=1e-10)
+        np.testing.assert_allclose(x, [1.0, 1.0], atol=1e-6)
+        self.assertLess(value, 1e-12)
+        self.assertEqual(iterations, counts['reflections'] + counts['expansions'] + counts['contractions']
+                         + counts['shrinks'])
+
+    def test_adaptive_coefficients(self):
+        """Коэффициенты Гао — Хана зависят от размерности"""
+        self.assertEqual(nelder_mead.coefficients(2), (1.0, 2.0, 0.5, 0.5))
+        self.assertEqual(nelder_mead.coefficients(4), (1.0, 1.5, 0.625, 0.75))
+        self.assertEqual(nelder_mead.coefficients(4, adaptive=False), (1.0, 2.0, 0.5, 0.5))
+
+    def test_stopping_criteria_keep_optimality_gap(self):
+        """rtol/xtol проверяются только при улучшении лучшей вершины: симплекс не останавливается на отражениях"""
+        problem = FitProblem.from_table(self.table)
+        for criteria in ({'xtol': 1e-9}, {'rtol': 1e-12}):
+            result = get_solver('nelder_mead').run([problem], 0, stop=StoppingCriteria(**criteria))
+            self.assertLess(result.optimality_gap, 1e-8, criteria)
+            self.assertGreater(result.iterations, 10, criteria)
+
+    def test_nelder_mead_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(title="Empty Table", temperature=298.15, author=self.user)
+        result = nelder_mead.nelder_mead([empty_table], 0)
+        self.assertEqual((result.a, result.b), (0.0, 0.0))
+
+class BfgsAlgorithmTest(AlgorithmTestCase):
+    """Тесты для метода BFGS"""
+
+    def test_bfgs_basic(self):
+        """BFGS из реестра находит оптимум МНК за несколько итераций"""
+        result = get_solver('bfgs').run(self.tables, self.table_ind)
+        self.assertAlgorithmResults(result, "Метод BFGS")
+        self.assertLessEqual(result.iterations, 15)
+
+        problem = FitProblem.from_table(self.table)
+        self.assertLess(problem.mse(result.a, result.b) - problem.min_loss, 1e-9 * problem.min_loss)
+        self.assertEqual(result.stats['skipped_updates'], 0)
+        self.assertEqual(result.stats['updates'], result.iterations)
+
+    def test_bfgs_ill_conditioned_quadratic(self):
+        """На плохо обусловленной квадратичной функции 20 переменных BFGS на порядок быстрее спуска"""
+        weights = np.logspace(0, 3, 20)
+        loss_fn = lambda x: 0.5 * float(weights @ (x * x))
+        grad_fn = lambda x: weights * x
+        x0 = np.ones(20)
+
+        x, iterations, counts = bfgs.bfgs_minimize(loss_fn, grad_fn, x0, eps=1e-6, max_iters=1000)
+        self.assertLess(np.linalg.norm(grad_fn(x)), 1e-6)
+
+        descent = 0
+        params, loss = x0, loss_fn(x0)
+        while np.linalg.norm(grad_fn(params)) >= 1e-6 and descent < 5000:
+            grad = grad_fn(params)
+            _, params, loss = gradient.armijo_step(loss_fn, params, loss, grad, -grad, 1.0)
+            descent += 1
+        self.assertLess(iterations * 5, descent)
+
+    def test_bfgs_rosenbrock(self):
+        """Условие кривизны сохраняет H положительно определенной на невыпуклой функции"""
+        rosenbrock = lambda p: (1.0 - p[0]) ** 2 + 100.0 * (p[1] - p[0] ** 2) ** 2
+        grad_fn = lambda p: np.array([-2.0 * (1.0 - p[0]) - 400.0 * p[0] * (p[1] - p[0] ** 2),
+                                      200.0 * (p[1] - p[0] ** 2)])
+        x, iterations, counts = bfgs.bfgs_minimize(rosenbrock, grad_fn, (-1.2, 1.0), eps=1e-8)
+        np.testing.assert_allclose(x, [1.0, 1.0], atol=1e-6)
+        self.assertLess(iterations, 100)
+        self.assertEqual(counts['gradient_evaluations'], 1 + iterations + counts['extensions'])
+
+    def test_short_step_extended(self):
+        """Слишком короткий шаг Армихо удлиняется до выполнения условия Вольфе"""
+        loss_fn = lambda x: 0.5 * float(x @ x)
+        grad_fn = lambda x: x
+        x, iterations, counts = bfgs.bfgs_minimize(lambda x: 1e-3 * loss_fn(x), lambda x: 1e-3 * grad_fn(x),
+                                                   np.ones(2), eps=1e-12, c2=0.1)
+        self.assertGreater(counts['extensions'], 0)
+        self.assertLess(np.linalg.norm(x), 1e-9)
+
+    def test_bfgs_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(title="Empty Table", temperature=298.15, author=self.user)
+        result = bfgs.bfgs([empty_table], 0)
+        self.assertEqual((result.a, result.b), (0.0, 0.0))
+
+class AnalyticAlgorithmTest(AlgorithmTestCase):
+    """Тесты для аналитического решения (МНК)"""
+
+    def test_analytic_basic(self):
+        """Базовый тест аналитического решения"""
+        result = analytic.analytic(self.tables, self.table_ind)
+        self.assertAlgorithmResults(result, "Аналитическое решение")
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertEqual(iterations, 1)
+        self.assertLess(avg_op, 50, "Средняя погрешность слишком велика")
+
+    def test_analytic_matches_lstsq(self):
+        """Решение совпадает с np.linalg.lstsq"""
+        a, b, *_ = analytic.analytic(self.tables, self.table_ind)
+
+        x2 = np.array([x for x, _ in test_data])
+        gexp = np.array([y for _, y in test_data], dtype=float)
+        rt = self.table.temperature * 8.314462618
+        x1 = 1.0 - x2
+        design = np.column_stack((rt * x1 * x1 * x2, rt * x1 * x2 * x2))
+        expected, *_ = np.linalg.lstsq(design, gexp, rcond=None)
+
+        self.assertAlmostEqual(a, expected[0], places=8)
+        self.assertAlmostEqual(b, expected[1], places=8)
+
+    def test_analytic_is_optimal(self):
+        """Ни один итерационный метод не дает меньшую ошибку"""
+        problem = FitProblem.from_table(self.table)
+        a, b, *_ = analytic.analytic(self.tables, self.table_ind)
+        best = problem.mse(a, b)
+
+        ga, gb, *_ = gradient.gradient(self.tables, self.table_ind)
+        self.assertLessEqual(best, problem.mse(ga, gb) + 1e-6)
+
+    def test_analytic_single_point(self):
+        """Вырожденный случай: одна точка"""
+        table = Table.objects.create(title="Single", temperature=298.15, author=self.user)
+        table.points.add(Point.objects.create(x_value=0.5, y_value=100.0))
+
+        a, b, iterations, *_ = analytic.analytic([table], 0)
+        gmod = FitProblem.from_table(table).model(a, b, [0.5])
+        self.assertAlmostEqual(gmod[0], 100.0, places=6)
+
+    def test_analytic_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(
+            title="Empty Table",
+            temperature=298.15,
+            author=self.user
+        )
+        result = analytic.analytic([empty_table], 0)
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertEqual(a, 0.0)
+        self.assertEqual(b, 0.0)
+        self.assertEqual(iterations, 0)
+
+
+class MarquardtAlgorithmTest(AlgorithmTestCase):
+    """Тесты для метода Левенберга — Марквардта"""
+
+    def test_marquardt_basic(self):
+        """Базовый тест метода Левенберга — Марквардта"""
+        result = marquardt.marquardt(self.tables, self.table_ind)
+        self.assertAlgorithmResults(result, "Метод Левенберга — Марквардта")
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertLess(avg_op, 50, "Средняя погрешность слишком велика")
+
+    def test_marquardt_converges_in_few_iterations(self):
+        """Сходимость за несколько итераций из (10, 10)"""
+        a, b, iterations, *_ = marquardt.marquardt(self.tables, self.table_ind)
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+
+        self.assertLessEqual(iterations, 10)
+        self.assertAlmostEqual(a, a_opt, places=6)
+        self.assertAlmostEqual(b, b_opt, places=6)
+
+    def test_levenberg_marquardt_nonlinear(self):
+        """Общая процедура работает и для нелинейной модели"""
+        x = np.linspace(0.0, 1.0, 20)
+        y = 2.0 * np.exp(-1.5 * x)
+
+        def residual_fn(p):
+            return p[0] * np.exp(p[1] * x) - y
+
+        def jacobian_fn(p):
+            e = np.exp(p[1] * x)
+            return np.column_stack((e, p[0] * x * e))
+
+        params, iterations = marquardt.levenberg_marquardt(residual_fn, jacobian_fn, (1.0, 0.0), max_iters=200)
+        self.assertAlmostEqual(params[0], 2.0, places=5)
+        self.assertAlmostEqual(params[1], -1.5, places=5)
+
+    def test_marquardt_empty_table(self):
+        """Тест с пустой таблицей"""
+        empty_table = Table.objects.create(
+            title="Empty Table",
+            temperature=298.15,
+            author=self.user
+        )
+        result = marquardt.marquardt([empty_table], 0)
+
+        a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+        self.assertEqual(a, 0.0)
+        self.assertEqual(b, 0.0)
+        self.assertEqual(iterations, 0)
+
+
 class AlgorithmComparisonTest(AlgorithmTestCase):
     """Сравнительные тесты алгоритмов"""
 
@@ -381,6 +848,723 @@ class HelperFunctionsTest(TestCase):
         self.assertEqual(len(result), 2)
 
 
+class FitProblemTest(AlgorithmTestCase):
+    """Тесты предвычисленной задачи МНК"""
+
+    def test_mse_matches_direct(self):
+        """MSE через достаточные статистики совпадает с прямым расчетом"""
+        problem = FitProblem.from_table(self.table)
+        l_points = [(x, y) for x, y in test_data]
+        for a, b in [(0.0, 0.0), (1.0, 1.0), (10.0, -3.0), (2.4, 1.5)]:
+            direct = gauss.sum_of_deviations(a, b, self.tables, self.table_ind, l_points)
+            self.assertAlmostEqual(problem.mse(a, b), direct, delta=1e-9 * max(direct, 1.0))
+
+    def test_mse_vectorized(self):
+        """MSE принимает массивы параметров"""
+        problem = FitProblem.from_table(self.table)
+        a = np.array([0.0, 1.0, 2.0])
+        b = np.array([0.0, 1.0, 3.0])
+        values = problem.mse(a, b)
+        self.assertEqual(values.shape, (3,))
+        for i in range(3):
+            self.assertAlmostEqual(values[i], problem.mse(float(a[i]), float(b[i])))
+
+    def test_optimum_is_minimum(self):
+        """В оптимуме MSE минимальна"""
+        problem = FitProblem.from_table(self.table)
+        a, b = problem.optimum()
+        self.assertAlmostEqual(problem.mse(a, b), problem.min_loss)
+        self.assertGreater(problem.mse(a + 0.01, b), problem.min_loss)
+        self.assertGreater(problem.mse(a, b - 0.01), problem.min_loss)
+
+    def test_evaluation_counters(self):
+        """Счетчики учитывают каждый набор параметров, в т.ч. в пакетных вызовах"""
+        problem = FitProblem.from_table(self.table)
+        problem.mse(1.0, 1.0)
+        problem.batch_mse(np.zeros((5, 2)))
+        problem.batch_mse(np.zeros((3, 2)), residual_norms=True)
+        problem.gradient(np.zeros(4), np.zeros(4))
+        self.assertEqual(problem.loss_evaluations, 9)
+        self.assertEqual(problem.gradient_evaluations, 4)
+        problem.optimality_gap(1.0, 1.0)
+        self.assertEqual(problem.loss_evaluations, 9)
+
+    def test_optimality_gap(self):
+        """Зазор до оптимума МНК: 0 в оптимуме, не зависит от масштаба задачи"""
+        problem = FitProblem.from_table(self.table)
+        a, b = problem.optimum()
+        self.assertEqual(problem.optimality_gap(a, b), 0.0)
+        gap = problem.optimality_gap(a + 0.1, b)
+        self.assertAlmostEqual(gap, (problem.mse(a + 0.1, b) - problem.min_loss) / problem.min_loss, places=6)
+        scaled = problem.scaled()
+        self.assertAlmostEqual(scaled.optimality_gap(*scaled.to_scaled(a + 0.1, b)), gap, places=9)
+
+        # данные точно описываются моделью — зазор конечен
+        exact = FitProblem(problem.x2, problem.model(a, b), problem.temperature)
+        self.assertTrue(np.isfinite(exact.optimality_gap(a + 0.1, b)))
+
+    def test_standard_errors(self):
+        """Стандартные ошибки и корреляция совпадают с s^2 (J^T J)^-1 по явному якобиану"""
+        problem = FitProblem.from_table(self.table)
+        a, b = problem.optimum()
+        jac = np.column_stack((problem.u, problem.v))
+        r = jac @ [a, b] - problem.gexp
+        cov = r @ r / (problem.n - 2) * np.linalg.inv(jac.T @ jac)
+
+        a_se, b_se, correlation = problem.standard_errors(a, b)
+        np.testing.assert_allclose([a_se, b_se], np.sqrt(np.diag(cov)), rtol=1e-9)
+        self.assertAlmostEqual(correlation, cov[0, 1] / np.sqrt(cov[0, 0] * cov[1, 1]), places=9)
+
+        scaled = problem.scaled()
+        scaled_errors = scaled.standard_errors(*scaled.to_scaled(a, b))
+        np.testing.assert_allclose(scaled.to_original(*scaled_errors[:2]), [a_se, b_se], rtol=1e-9)
+        self.assertIsNone(FitProblem([0.3, 0.6], [100.0, 120.0], 298.15).standard_errors(1.0, 1.0))
+
+    def test_empty_problem(self):
+        """Пустая таблица"""
+        empty_table = Table.objects.create(title="Empty", temperature=298.15, author=self.user)
+        problem = FitProblem.from_table(empty_table)
+        self.assertEqual(problem.n, 0)
+        self.assertEqual(problem.mse(1.0, 1.0), 0.0)
+
+    def test_scaled_problem(self):
+        """Обезразмеренная задача: |g'| <= 1, диагональ гессиана 2, тот же оптимум"""
+        problem = FitProblem.from_table(self.table)
+        scaled = problem.scaled()
+        self.assertAlmostEqual(float(np.max(np.abs(scaled.gexp))), 1.0)
+        np.testing.assert_allclose(np.diag(scaled.hessian()), [2.0, 2.0])
+
+        a, b = scaled.to_original(*scaled.optimum())
+        self.assertAlmostEqual(a, problem.a_opt, places=9)
+        self.assertAlmostEqual(b, problem.b_opt, places=9)
+        self.assertAlmostEqual(scaled.min_loss * scaled.loss_scale, problem.min_loss, places=6)
+        self.assertAlmostEqual(scaled.mse(*scaled.to_scaled(1.0, 2.0)) * scaled.loss_scale, problem.mse(1.0, 2.0),
+                               delta=1e-9 * problem.mse(1.0, 2.0))
+        np.testing.assert_allclose(scaled.model(*scaled.to_scaled(1.0, 2.0), x2=[0.3]) * scaled.scale[0],
+                                   problem.model(1.0, 2.0, x2=[0.3]))
+
+    def test_scaled_iterations_independent_of_units(self):
+        """В обезразмеренной задаче число итераций не зависит от масштаба данных и температуры"""
+        x2, gexp = zip(*test_data)
+        problems = [FitProblem(x2, np.array(gexp) * k, temperature) for k, temperature in
+                    [(1.0, 278.15), (0.01, 278.15), (30.0, 278.15), (1.0, 400.0)]]
+        for key in ('gauss', 'gauss_exact', 'gradient', 'gradient_step', 'marquardt'):
+            spec = get_solver(key)
+            results = [spec.run([problem], 0) for problem in problems]
+            self.assertEqual(len({result.iterations for result in results}), 1, key)
+            for problem, result in zip(problems, results):
+                gap = problem.mse(result.a, result.b) - problem.min_loss
+                self.assertLess(gap, 1e-6 * problem.min_loss, key)
+
+    def test_scaled_trace_in_original_units(self):
+        """История сходимости решателя из реестра записывается в исходных единицах"""
+        problem = FitProblem.from_table(self.table)
+        trace = Trace()
+        result = get_solver('gradient').run(self.tables, self.table_ind, trace=trace)
+        last = trace.progress()
+        self.assertAlmostEqual(last['a'], result.a, places=9)
+        self.assertAlmostEqual(last['b'], result.b, places=9)
+        self.assertAlmostEqual(last['loss'], problem.mse(result.a, result.b), delta=1e-6 * problem.min_loss)
+
+
+class BatchEvaluationTest(AlgorithmTestCase):
+    """Тесты пакетной оценки ошибки"""
+
+    def setUp(self):
+        super().setUp()
+        self.problem = FitProblem.from_table(self.table)
+        rng = np.random.default_rng(0)
+        self.params = rng.uniform(-5, 5, size=(257, 2))
+
+    def test_batch_matches_scalar(self):
+        """Пакетная MSE совпадает с поэлементной"""
+        losses = self.problem.batch_mse(self.params)
+        self.assertEqual(losses.shape, (257,))
+        for (a, b), loss in zip(self.params[:10], losses[:10]):
+            self.assertAlmostEqual(loss, self.problem.mse(a, b))
+
+    def test_batch_residual_norms_chunked(self):
+        """Блочный расчет норм не зависит от размера блока"""
+        mse_full, l2_full, linf_full = self.problem.batch_mse(self.params, residual_norms=True)
+        mse_chunk, l2_chunk, linf_chunk = self.problem.batch_mse(self.params, residual_norms=True, chunk_size=7)
+
+        np.testing.assert_allclose(mse_full, mse_chunk)
+        np.testing.assert_allclose(l2_full, l2_chunk)
+        np.testing.assert_allclose(linf_full, linf_chunk)
+        np.testing.assert_allclose(mse_full, self.problem.batch_mse(self.params), rtol=1e-9)
+        np.testing.assert_allclose(l2_full, np.sqrt(mse_full * self.problem.n))
+        self.assertTrue(np.all(linf_full <= l2_full + 1e-9))
+
+    def test_evaluate_batch_for_table(self):
+        """evaluate_batch по таблице"""
+        losses = evaluate_batch(self.tables, self.table_ind, [[1.0, 1.0], [2.0, 2.0]])
+        self.assertEqual(losses.shape, (2,))
+        l_points = [(x, y) for x, y in test_data]
+        self.assertAlmostEqual(losses[0], gauss.sum_of_deviations(1.0, 1.0, self.tables, self.table_ind, l_points))
+
+
+class BootstrapTest(AlgorithmTestCase):
+    """Тесты бутстреп-интервалов"""
+
+    def test_batched_fits_match_lstsq(self):
+        """Пакетное решение совпадает с МНК по каждой выборке отдельно"""
+        problem = FitProblem.from_table(self.table)
+        indices = bootstrap.resample_indices(np.random.default_rng(0), problem.n, 50)
+        fits = bootstrap.bootstrap_fits(problem, indices)
+        for row, params in zip(indices, fits):
+            if not np.isfinite(params).all():
+                continue
+            expected, *_ = np.linalg.lstsq(np.column_stack((problem.u[row], problem.v[row])),
+                                           problem.gexp[row], rcond=None)
+            np.testing.assert_allclose(params, expected, rtol=1e-8)
+        np.testing.assert_allclose(bootstrap.bootstrap_fits(problem, indices, chunk_size=7), fits, rtol=1e-12)
+
+    def test_degenerate_resample(self):
+        """Выборка из одной точки вырождена — nan"""
+        problem = FitProblem.from_table(self.table)
+        fits = bootstrap.bootstrap_fits(problem, np.zeros((1, problem.n), dtype=int))
+        self.assertTrue(np.isnan(fits).all())
+
+    def test_intervals(self):
+        """Интервалы содержат оптимум МНК, в исходных единицах и воспроизводимы при заданном seed"""
+        problem = FitProblem.from_table(self.table)
+        a_opt, b_opt = problem.optimum()
+        ci = bootstrap.bootstrap_intervals(problem, resamples=500, seed=1)
+        self.assertEqual(ci['resamples'], 500)
+        self.assertLessEqual(ci['valid'], 500)
+        self.assertTrue(ci['a'][0] < a_opt < ci['a'][1])
+        self.assertTrue(ci['b'][0] < b_opt < ci['b'][1])
+        self.assertGreater(ci['a_std'], 0.0)
+        np.testing.assert_allclose(bootstrap.bootstrap_intervals(problem.scaled(), resamples=500, seed=1)['a'],
+                                   ci['a'], rtol=1e-9)
+        self.assertEqual(bootstrap.bootstrap_intervals(problem, resamples=500, seed=1), ci)
+
+        narrow = bootstrap.bootstrap_intervals(problem, resamples=500, level=0.5, seed=1)
+        self.assertGreater(narrow['a'][0], ci['a'][0])
+
+    def test_too_few_points(self):
+        """Для таблиц меньше чем из трех точек интервалы не считаются"""
+        problem = FitProblem([0.3, 0.6], [100.0, 120.0], 298.15)
+        self.assertIsNone(bootstrap.bootstrap_intervals(problem))
+        self.assertIsNone(bootstrap.bootstrap_intervals(FitProblem.from_table(self.table), resamples=0))
+
+class AnalyticDerivativeTest(AlgorithmTestCase):
+    """Тесты аналитического градиента и гессиана"""
+
+    def setUp(self):
+        super().setUp()
+        self.x2_arr = np.array([x for x, _ in test_data])
+        self.gexp_arr = np.array([y for _, y in test_data], dtype=float)
+
+    def test_gradient_matches_finite_difference(self):
+        """Аналитический градиент совпадает с центральной разностью"""
+        problem = FitProblem.from_table(self.table)
+        params = np.array([1.0, 3.0])
+        grad = problem.gradient(params[0], params[1])
+        h = 1e-4
+        for i in range(2):
+            p_plus, p_minus = params.copy(), params.copy()
+            p_plus[i] += h
+            p_minus[i] -= h
+            numeric = (
+                gradient.sum_of_deviations(p_plus, self.x2_arr, self.gexp_arr, self.table.temperature)
+                - gradient.sum_of_deviations(p_minus, self.x2_arr, self.gexp_arr, self.table.temperature)
+            ) / (2 * h)
+            self.assertAlmostEqual(grad[i], numeric, delta=1e-5 * abs(numeric))
+
+    def test_gradient_modules_agree(self):
+        """gradient.derivative — обертка над FitProblem.gradient"""
+        problem = FitProblem.from_table(self.table)
+        params = [2.0, 1.0]
+        expected = problem.gradient(*params)
+        np.testing.assert_allclose(
+            gradient.derivative(params, self.x2_arr, self.gexp_arr, self.table.temperature), expected, rtol=1e-12)
+        np.testing.assert_allclose(gradient.derivative(params, None, None, None, problem), expected, rtol=1e-12)
+
+    def test_gradient_zero_at_optimum(self):
+        """В оптимуме градиент равен нулю"""
+        problem = FitProblem.from_table(self.table)
+        grad = problem.gradient(*problem.optimum())
+        self.assertLess(np.linalg.norm(grad), 1e-6)
+
+    def test_hessian(self):
+        """Гессиан симметричен, положительно определен и совпадает с прямым расчетом 2/n * B B^T"""
+        hess = FitProblem.from_table(self.table).hessian()
+        x1 = 1.0 - self.x2_arr
+        rt = self.table.temperature * 8.314462618
+        basis = np.vstack((rt * x1 * x1 * self.x2_arr, rt * x1 * self.x2_arr * self.x2_arr))
+        np.testing.assert_allclose(hess, hess.T)
+        np.testing.assert_allclose(hess, 2.0 * basis @ basis.T / self.x2_arr.size, rtol=1e-12)
+        self.assertTrue(np.all(np.linalg.eigvalsh(hess) > 0))
+
+    def test_gradient_solvers_converge_fast(self):
+        """С точным градиентом методы сходятся за десятки итераций"""
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        for solver in (gradient.gradient, gradient_step.gradient_step):
+            a, b, iterations, *_ = solver(self.tables, self.table_ind)
+            self.assertLess(iterations, 200)
+            self.assertAlmostEqual(a, a_opt, places=6)
+            self.assertAlmostEqual(b, b_opt, places=6)
+
+
+class TraceTest(AlgorithmTestCase):
+    """Тесты истории сходимости"""
+
+    def test_trace_bounded_length(self):
+        """Длина истории ограничена capacity, последняя итерация сохраняется"""
+        trace = Trace(capacity=16)
+        for i in range(1000):
+            trace.record(1000.0 - i, i, -i, 0.1)
+        self.assertLessEqual(len(trace), 16)
+
+        data = trace.to_dict()
+        self.assertEqual(data['iteration'][0], 0)
+        self.assertEqual(data['iteration'][-1], 999)
+        self.assertEqual(data['loss'][-1], 1.0)
+        self.assertEqual(data['iteration'], sorted(data['iteration']))
+        self.assertLessEqual(len(data['loss']), 17)
+
+    def test_trace_progress_callback(self):
+        """Обработчик прогресса вызывается не чаще interval и не сериализуется"""
+        updates = []
+        trace = Trace(callback=updates.append, interval=0.0)
+        for i in range(100):
+            trace.record(100.0 - i, i, -i)
+        self.assertEqual([u['iteration'] for u in updates], list(range(0, 100, Trace.CHECK_EVERY)))
+        self.assertEqual(trace.progress()['iteration'], 99)
+
+        throttled = []
+        trace = Trace(callback=throttled.append, interval=3600.0)
+        for i in range(1000):
+            trace.record(1.0, 0.0, 0.0)
+        self.assertEqual(len(throttled), 1)
+
+        restored = pickle.loads(pickle.dumps(trace))
+        self.assertIsNone(restored.callback)
+        self.assertEqual(restored.to_dict(), trace.to_dict())
+
+    def test_trace_every_solver(self):
+        """Каждый решатель записывает историю"""
+        solvers = [
+            lambda t: gauss.gauss(self.tables, self.table_ind, trace=t),
+            lambda t: gauss.gauss(self.tables, self.table_ind, exact=True, trace=t),
+            lambda t: gauss_step.gauss_step(self.tables, self.table_ind, trace=t),
+            lambda t: gradient.gradient(self.tables, self.table_ind, trace=t),
+            lambda t: gradient_step.gradient_step(self.tables, self.table_ind, trace=t),
+            lambda t: otzhig.otzhig(self.tables, self.table_ind, max_iters=1000, trace=t),
+            lambda t: otzhig.otzhig_replica(self.tables, self.table_ind, max_iters=500, seed=0, trace=t),
+            lambda t: marquardt.marquardt(self.tables, self.table_ind, trace=t),
+            lambda t: analytic.analytic(self.tables, self.table_ind, trace=t),
+        ]
+        for solver in solvers:
+            trace = Trace()
+            a, b, iterations, *_ = solver(trace)
+            data = trace.to_dict()
+            self.assertGreater(len(data['loss']), 0)
+            self.assertEqual(set(data), set(Trace.FIELDS))
+            self.assertAlmostEqual(data['a'][-1], a, places=6)
+            self.assertAlmostEqual(data['b'][-1], b, places=6)
+
+
+class SolverRegistryTest(AlgorithmTestCase):
+    """Тесты реестра решателей"""
+
+    def test_every_solver_returns_result(self):
+        """Каждый зарегистрированный решатель возвращает SolverResult"""
+        fast = {'otzhig': {'max_iters': 1000}, 'otzhig_replica': {'max_iters': 500, 'seed': 0}}
+        a_se, b_se, correlation = FitProblem.from_table(self.table).standard_errors(
+            *FitProblem.from_table(self.table).optimum())
+        for key, spec in SOLVERS.items():
+            result = spec.run(self.tables, self.table_ind, **fast.get(key, {}))
+            self.assertIsInstance(result, SolverResult, key)
+            self.assertEqual(len(tuple(result)), 10)
+            a, b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = result
+            self.assertEqual((a, b), (result.a, result.b))
+            self.assertEqual(len(result.table_data()), len(l_x2))
+            self.assertEqual(result[9], avg_op)
+            # стандартные ошибки есть у каждого решателя; RSS минимальна в оптимуме,
+            # поэтому в найденной точке они не меньше, чем в оптимуме
+            self.assertGreaterEqual(result.a_se, a_se * (1 - 1e-9), key)
+            self.assertGreaterEqual(result.b_se, b_se * (1 - 1e-9), key)
+            self.assertAlmostEqual(result.correlation, correlation, places=9, msg=key)
+
+    def test_evaluations_and_gap(self):
+        """Решатели из реестра сообщают число вычислений ошибки и градиента и зазор до оптимума"""
+        problem = FitProblem.from_table(self.table)
+        for key in ('gauss', 'gradient', 'bfgs', 'nelder_mead', 'marquardt'):
+            scaled = problem.scaled()
+            with mock.patch.object(FitProblem, 'scaled', return_value=scaled):
+                result = get_solver(key).run([problem], 0)
+            self.assertEqual(result.loss_evaluations, scaled.loss_evaluations, key)
+            self.assertEqual(result.gradient_evaluations, scaled.gradient_evaluations, key)
+            self.assertGreater(result.loss_evaluations, 0, key)
+            self.assertAlmostEqual(result.optimality_gap, problem.optimality_gap(result.a, result.b), places=9)
+            self.assertLess(result.optimality_gap, 1e-6, key)
+        self.assertEqual(get_solver('nelder_mead').run([problem], 0).gradient_evaluations, 0)
+        self.assertEqual(get_solver('analytic').run([problem], 0).optimality_gap, 0.0)
+
+    def test_exact_variant_options(self):
+        """Вариант gauss_exact передает exact=True"""
+        self.assertTrue(get_solver('gauss_exact').options['exact'])
+        self.assertNotIn('exact', get_solver('gauss').options)
+        self.assertEqual(get_solver('gauss').func, get_solver('gauss_exact').func)
+
+    def test_unknown_solver(self):
+        """Неизвестный ключ — ValueError"""
+        with self.assertRaises(ValueError):
+            get_solver('unknown')
+
+
+class WarmStartTest(AlgorithmTestCase):
+    """Тесты теплого старта"""
+
+    def test_analytic_without_history(self):
+        """Без прошлых расчетов используется аналитическая оценка"""
+        problem = FitProblem.from_table(self.table)
+        params, seed = warm_start(self.table, problem, 'previous')
+        self.assertEqual(seed['source'], 'analytic')
+        self.assertEqual(params, tuple(float(v) for v in problem.optimum()))
+
+    def test_best_previous_result(self):
+        """Из прошлых расчетов выбирается пара с наименьшей MSE"""
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        CalculationResult.objects.create(user=self.user, table=self.table, param_a=10.0, param_b=10.0)
+        good = CalculationResult.objects.create(
+            user=self.user, table=self.table, param_a=a_opt + 0.01, param_b=b_opt - 0.01)
+
+        params, seed = warm_start(self.table, FitProblem.from_table(self.table), 'previous')
+        self.assertEqual(seed['source'], 'previous')
+        self.assertEqual(seed['result_id'], good.id)
+        self.assertAlmostEqual(params[0], a_opt + 0.01)
+
+    def test_warm_start_reduces_iterations(self):
+        """С теплым стартом итерационные методы сходятся быстрее"""
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        CalculationResult.objects.create(
+            user=self.user, table=self.table, param_a=a_opt + 0.05, param_b=b_opt + 0.05)
+
+        for key in ('gauss', 'gauss_step', 'gradient', 'gradient_step'):
+            spec = get_solver(key)
+            cold = run_solver(spec, self.tables, self.table_ind)
+            warm = run_solver(spec, self.tables, self.table_ind, warm='previous')
+            self.assertIsNone(cold.seed)
+            self.assertEqual(warm.seed['source'], 'previous')
+            self.assertLessEqual(warm.iterations, cold.iterations, key)
+            if key.startswith('gauss'):
+                self.assertLess(warm.iterations, cold.iterations / 2, key)
+
+    def test_analytic_not_seeded(self):
+        """Аналитическое решение не использует начальное приближение"""
+        result = run_solver(get_solver('analytic'), self.tables, self.table_ind, warm='analytic')
+        self.assertIsNone(result.seed)
+
+    def test_unknown_source(self):
+        """Неизвестный источник — ValueError"""
+        with self.assertRaises(ValueError):
+            warm_start(self.table, FitProblem.from_table(self.table), 'random')
+
+
+
+class StoppingCriteriaTest(AlgorithmTestCase):
+    """Тесты бюджета времени и общих критериев остановки"""
+
+    ITERATIVE = ('gauss', 'gauss_step', 'gradient', 'gradient_step', 'marquardt', 'otzhig', 'otzhig_replica')
+
+    def test_zero_budget_returns_best_so_far(self):
+        """При нулевом бюджете решатель возвращает стартовую точку с пометкой truncated"""
+        problem = FitProblem.from_table(self.table)
+        for key in self.ITERATIVE:
+            spec = get_solver(key)
+            result = spec.run(self.tables, self.table_ind, initial_params=(5.0, 5.0), time_budget=0.0)
+            self.assertTrue(result.truncated, key)
+            self.assertEqual(result.iterations, 0, key)
+            self.assertLessEqual(problem.mse(result.a, result.b), problem.mse(5.0, 5.0), key)
+
+    def test_generous_budget_not_truncated(self):
+        """С большим бюджетом результат совпадает с расчетом без бюджета"""
+        for key in ('gauss', 'gradient', 'marquardt'):
+            spec = get_solver(key)
+            free = spec.run(self.tables, self.table_ind)
+            budgeted = spec.run(self.tables, self.table_ind, time_budget=60.0)
+            self.assertFalse(budgeted.truncated, key)
+            self.assertEqual((budgeted.a, budgeted.b, budgeted.iterations), (free.a, free.b, free.iterations))
+
+    def test_expired_budget_midway(self):
+        """Бюджет, истекший во время расчета, возвращает промежуточную, но улучшенную точку"""
+        problem = FitProblem.from_table(self.table)
+        stop = StoppingCriteria(check_every=1)
+        with mock.patch('main.stopping.time') as clock:
+            clock.monotonic.side_effect = [0.0] + [0.0] * 50 + [10.0] * 1000
+            result = gauss.gauss(self.tables, self.table_ind, time_budget=1.0, stop=stop)
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.iterations, 50)
+        self.assertLess(problem.mse(result.a, result.b), problem.mse(1.0, 1.0))
+
+    def test_convergence_criteria(self):
+        """rtol, xtol и gtol останавливают расчет раньше собственных критериев метода"""
+        base = gauss_step.gauss_step(self.tables, self.table_ind)
+        loose = gauss_step.gauss_step(self.tables, self.table_ind, stop=StoppingCriteria(rtol=1e-3))
+        self.assertLess(loose.iterations, base.iterations)
+        self.assertFalse(loose.truncated)
+
+        stop = StoppingCriteria(xtol=1e-3, gtol=1e3)
+        self.assertTrue(stop.converged(step=1e-4))
+        self.assertTrue(stop.converged(grad_norm=10.0))
+        self.assertFalse(stop.converged(loss=1.0, prev_loss=2.0, step=1.0, grad_norm=1e4))
+
+    def test_criteria_ignore_non_improving_steps(self):
+        """Отвергнутый или не улучшивший шаг не считается сходимостью по rtol/xtol"""
+        stop = StoppingCriteria(rtol=1e-12, xtol=1e-9)
+        self.assertFalse(stop.converged(loss=1.0, prev_loss=1.0, step=0.0))
+        self.assertFalse(stop.converged(loss=2.0, prev_loss=1.0, step=1e-12))
+        self.assertTrue(stop.converged(loss=1.0 - 1e-15, prev_loss=1.0, step=1.0))
+        self.assertTrue(stop.converged(loss=0.5, prev_loss=1.0, step=1e-12))
+        rows = stop.converged_rows(np.array([1.0, 1.0, 0.5]), np.array([1.0, 2.0, 1.0]),
+                                   np.array([0.0, 1.0, 1e-12]), np.ones(3))
+        np.testing.assert_array_equal(rows, [False, False, True])
+
+    def test_criteria_keep_optimality_gap(self):
+        """С жесткими rtol/xtol гаусс и отжиг доходят до оптимума, а не останавливаются на застое"""
+        problem = FitProblem.from_table(self.table)
+        for key, options in (('gauss', {}), ('otzhig', {'seed': 1})):
+            free = get_solver(key).run([problem], 0, **options)
+            for criteria in ({'xtol': 1e-9}, {'rtol': 1e-12}):
+                result = get_solver(key).run([problem], 0, stop=StoppingCriteria(**criteria), **options)
+                self.assertLess(result.optimality_gap, max(10 * free.optimality_gap, 1e-8), (key, criteria))
+
+    def test_resolve_copies_criteria(self):
+        """resolve не изменяет переданный объект (его можно использовать повторно)"""
+        stop = StoppingCriteria(rtol=1e-6)
+        resolved = StoppingCriteria.resolve(stop, 0.0)
+        self.assertTrue(resolved.expired(0))
+        self.assertIsNone(stop.deadline)
+        self.assertFalse(stop.truncated)
+        self.assertEqual(resolved.rtol, 1e-6)
+
+    def test_truncated_result_not_cached(self):
+        """Прерванный расчет не кэшируется и сохраняется с пометкой truncated"""
+        fit_cache.clear()
+        spec = get_solver('gauss')
+        first = run_solver(spec, self.tables, self.table_ind, time_budget=0.0)
+        second = run_solver(spec, self.tables, self.table_ind, time_budget=0.0)
+        self.assertTrue(first.truncated)
+        self.assertFalse(second.cached)
+
+        full = run_solver(spec, self.tables, self.table_ind, time_budget=60.0)
+        self.assertFalse(full.truncated)
+        self.assertTrue(run_solver(spec, self.tables, self.table_ind).cached)
+
+        calculation, payload = save_result(spec, first, user=self.user, table=self.table)
+        self.assertTrue(payload['truncated'])
+        calculation.refresh_from_db()
+        self.assertTrue(calculation.truncated)
+
+
+class FitCacheTest(AlgorithmTestCase):
+    """Тесты кэша результатов"""
+
+    def setUp(self):
+        super().setUp()
+        fit_cache.clear()
+
+    def test_key_depends_on_content(self):
+        """Ключ не зависит от порядка точек, но зависит от данных и настроек"""
+        problem = FitProblem.from_table(self.table)
+        shuffled = FitProblem(problem.x2[::-1], problem.gexp[::-1], problem.temperature)
+        warmer = FitProblem(problem.x2, problem.gexp, problem.temperature + 1)
+
+        key = fit_cache.fit_key(problem, 'gauss', {})
+        self.assertEqual(key, fit_cache.fit_key(shuffled, 'gauss', {}))
+        self.assertNotEqual(key, fit_cache.fit_key(warmer, 'gauss', {}))
+        self.assertNotEqual(key, fit_cache.fit_key(problem, 'gauss_step', {}))
+        self.assertNotEqual(key, fit_cache.fit_key(problem, 'gauss', {'exact': True}))
+
+    def test_deterministic_hit(self):
+        """Повторный запуск детерминированного метода берется из кэша"""
+        spec = get_solver('gauss')
+        first = run_solver(spec, self.tables, self.table_ind, trace=Trace())
+        second = run_solver(spec, self.tables, self.table_ind, trace=Trace())
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual((second.a, second.b, second.iterations), (first.a, first.b, first.iterations))
+        self.assertEqual(second.trace_data(), first.trace_data())
+
+    def test_bootstrap_on_cache_hit(self):
+        """Интервалы считаются и для результата из кэша"""
+        spec = get_solver('gauss')
+        run_solver(spec, self.tables, self.table_ind)
+        result = run_solver(spec, self.tables, self.table_ind, bootstrap=200)
+        self.assertTrue(result.cached)
+        self.assertEqual(result.bootstrap['resamples'], 200)
+        self.assertIsNone(run_solver(spec, self.tables, self.table_ind).bootstrap)
+
+    def test_seeded_otzhig_cacheable(self):
+        """Отжиг кэшируется только с заданным seed"""
+        spec = get_solver('otzhig')
+        options = {'max_iters': 500}
+        run_solver(spec, self.tables, self.table_ind, options=options)
+        self.assertFalse(run_solver(spec, self.tables, self.table_ind, options=options).cached)
+
+        options['seed'] = 7
+        first = run_solver(spec, self.tables, self.table_ind, options=options)
+        second = run_solver(spec, self.tables, self.table_ind, options=options)
+        self.assertTrue(second.cached)
+        self.assertEqual((second.a, second.b), (first.a, first.b))
+
+        fresh = spec.run(self.tables, self.table_ind, max_iters=500, seed=7)
+        self.assertEqual((fresh.a, fresh.b), (first.a, first.b))
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняется давно не использованная запись"""
+        fits = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fit-results-test',
+            'TIMEOUT': None,
+            'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2},
+        }
+        with override_settings(CACHES={**settings.CACHES, 'fits': fits}):
+            fit_cache.store('k1', 1)
+            fit_cache.store('k2', 2)
+            fit_cache.lookup('k1')
+            fit_cache.store('k3', 3)
+
+            self.assertEqual(fit_cache.lookup('k1'), 1)
+            self.assertIsNone(fit_cache.lookup('k2'))
+            self.assertEqual(fit_cache.lookup('k3'), 3)
+
+
+class CompareAllTest(AlgorithmTestCase):
+    """Тесты режима сравнения методов"""
+
+    def setUp(self):
+        super().setUp()
+        fit_cache.clear()
+
+    def test_compare_parallel(self):
+        """Параллельный запуск дает те же результаты, что и последовательный"""
+        results = compare_all(self.table)
+        self.assertEqual(tuple(results), COMPARE_ALGORITHMS)
+
+        for key in ('gauss', 'gauss_step', 'gradient', 'gradient_step'):
+            direct = get_solver(key).run(self.tables, self.table_ind)
+            self.assertEqual((results[key].a, results[key].b), (direct.a, direct.b), key)
+            self.assertFalse(results[key].cached)
+            self.assertGreater(len(results[key].trace_data()['loss']), 0)
+
+        # детерминированные методы при повторе берутся из кэша
+        again = compare_all(self.table, parallel=False)
+        self.assertTrue(all(again[key].cached for key in ('gauss', 'gauss_step', 'gradient', 'gradient_step')))
+        self.assertFalse(again['otzhig'].cached)
+
+    def test_compare_broken_pool(self):
+        """Сломанный пул (погиб процесс-обработчик) сбрасывается, расчет продолжается последовательно"""
+        broken = mock.Mock()
+        broken.submit.side_effect = BrokenProcessPool('worker died')
+        with mock.patch.object(compare, '_pool', broken):
+            results = compare_all(self.table, ('gauss', 'gradient'))
+            self.assertIsNone(compare._pool)
+        broken.shutdown.assert_called_once()
+        self.assertEqual(tuple(results), ('gauss', 'gradient'))
+        direct = get_solver('gauss').run(self.tables, self.table_ind)
+        self.assertEqual((results['gauss'].a, results['gauss'].b), (direct.a, direct.b))
+
+        # переданный снаружи пул не закрывается
+        fit_cache.clear()
+        external = mock.Mock()
+        external.submit.side_effect = BrokenProcessPool('worker died')
+        results = compare_all(self.table, ('gauss', 'gradient'), executor=external)
+        self.assertEqual((results['gauss'].a, results['gauss'].b), (direct.a, direct.b))
+        external.shutdown.assert_not_called()
+
+    def test_compare_time_budget(self):
+        """Бюджет времени передается итерационным методам; прерванные расчеты не кэшируются"""
+        results = compare_all(self.table, ('gauss', 'otzhig', 'analytic'), parallel=False, time_budget=0.0)
+        self.assertTrue(results['gauss'].truncated)
+        self.assertTrue(results['otzhig'].truncated)
+        self.assertFalse(results['analytic'].truncated)
+
+        again = compare_all(self.table, ('gauss',), parallel=False)
+        self.assertFalse(again['gauss'].cached)
+        self.assertFalse(again['gauss'].truncated)
+
+    def test_compare_bootstrap(self):
+        """Доверительные интервалы считаются один раз на таблицу и одинаковы во всех строках, в том числе из кэша"""
+        results = compare_all(self.table, ('gauss', 'otzhig'), parallel=False, bootstrap=50)
+        self.assertEqual(results['gauss'].bootstrap['resamples'], 50)
+        self.assertLessEqual(results['gauss'].bootstrap['a'][0], results['gauss'].bootstrap['a'][1])
+        self.assertIs(results['otzhig'].bootstrap, results['gauss'].bootstrap)
+
+        again = compare_all(self.table, ('gauss',), parallel=False, bootstrap=50)
+        self.assertTrue(again['gauss'].cached)
+        self.assertEqual(again['gauss'].bootstrap['resamples'], 50)
+        self.assertIsNone(compare_all(self.table, ('gauss',), parallel=False)['gauss'].bootstrap)
+
+        summary = save_all(results, user=self.user, table=self.table)
+        self.assertEqual(summary[0]['bootstrap'], results['gauss'].bootstrap)
+        self.assertEqual(CalculationResult.objects.get(id=summary[0]['result_id']).bootstrap,
+                         results['gauss'].bootstrap)
+
+    def test_save_all(self):
+        """Результаты сохраняются одной транзакцией, по строке на метод"""
+        results = compare_all(self.table, ('gauss', 'analytic'), parallel=False)
+        summary = save_all(results, user=self.user, table=self.table)
+
+        self.assertEqual([row['algorithm'] for row in summary], ['gauss', 'analytic'])
+        self.assertEqual(CalculationResult.objects.filter(table=self.table).count(), 2)
+        for row in summary:
+            saved = CalculationResult.objects.get(id=row['result_id'])
+            self.assertEqual(saved.algorithm, row['label'])
+            self.assertEqual(saved.average_op, row['average_op'])
+
+
+class FitAllCommandTest(AlgorithmTestCase):
+    """Тесты пакетного расчета manage.py fit_all"""
+
+    def setUp(self):
+        super().setUp()
+        # вторая таблица (копия точек) и таблица без автора
+        self.other = Table.objects.create(title="Copy", temperature=298.15, author=self.user)
+        self.other.points.set(self.table.points.all())
+        orphan = Table.objects.create(title="Orphan", temperature=298.15)
+        orphan.points.set(self.table.points.all())
+
+    def test_load_problems(self):
+        """Точки порции таблиц читаются одним запросом"""
+        with self.assertNumQueries(1):
+            problems = load_problems([self.table, self.other])
+        expected = FitProblem.from_table(self.table)
+        np.testing.assert_allclose(np.sort(problems[self.table.id].x2), np.sort(expected.x2))
+        self.assertEqual(problems[self.other.id].temperature, 298.15)
+
+    def test_fit_all_in_process(self):
+        """Каждая таблица с автором рассчитывается каждым алгоритмом"""
+        out = StringIO()
+        call_command('fit_all', '--algorithms', 'gauss', 'analytic', '--workers', '1', '--chunk-size', '2', stdout=out)
+
+        rows = CalculationResult.objects.all()
+        self.assertEqual(rows.count(), 4)
+        self.assertEqual(set(rows.values_list('algorithm', flat=True)), {'Метод Гаусса', 'Аналитическое решение (МНК)'})
+        self.assertIn('расчетов/сек', out.getvalue())
+        self.assertIn('пропущено таблиц: 1', out.getvalue())
+
+        analytic_row = rows.get(table=self.table, algorithm='Аналитическое решение (МНК)')
+        a_opt, b_opt = FitProblem.from_table(self.table).optimum()
+        self.assertAlmostEqual(analytic_row.param_a, a_opt)
+        self.assertIsNotNone(analytic_row.trace)
+
+    def test_fit_all_pool(self):
+        """Пул процессов и владелец --user"""
+        other_user = User.objects.create_user(username='nightly', password='x')
+        call_command('fit_all', '--algorithms', 'gradient_step', '--workers', '2', '--user', 'nightly',
+                     stdout=StringIO())
+        self.assertEqual(CalculationResult.objects.filter(user=other_user).count(), 3)
+
+    def test_unknown_user(self):
+        """Неизвестный пользователь — ошибка команды"""
+        with self.assertRaises(CommandError):
+            call_command('fit_all', '--user', 'nobody', stdout=StringIO())
+
 # Добавляем маркер для медленных тестов
 test_data = [
     (0.0697, 407), (0.0960, 523), (0.1038, 554), (0.1312, 634),
@@ -3,10 +3,11 @@
 Используем правильные имена URL: 'graphs' вместо 'graph_view'
 """
 import json
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
-from main.models import Table, Point, CalculationResult, Post, Comment
+from main.models import Table, Point, CalculationResult, FitJob, Post, Comment
+from main import fit_cache, jobs
 
 import pytest
 
@@ -64,6 +65,11 @@ class CalculationsViewExtendedTest(TestCase):
         # Проверяем, что результат сохранен в БД
         result = CalculationResult.objects.get(id=json_data['result_id'])
         self.assertEqual(result.algorithm, 'Метод Гаусса')
+
+        # История сходимости сохраняется и возвращается
+        self.assertIn('trace', json_data)
+        self.assertEqual(json_data['trace'], result.trace)
+        self.assertGreater(len(result.trace['loss']), 0)
         self.assertEqual(result.user, self.user)
         self.assertIsNotNone(result.param_a)
         self.assertIsNotNone(result.param_b)
@@ -80,8 +86,8 @@ class CalculationsViewExtendedTest(TestCase):
         json_data = response.json()
 
         self.assertEqual(json_data['algorithm'], 'gauss_step')
-        self.assertIn('c', json_data)
-        self.assertIn('d', json_data)
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
 
         result = CalculationResult.objects.get(id=json_data['result_id'])
         self.assertEqual(result.algorithm, 'Метод Гаусса с переменным шагом')
@@ -98,8 +104,8 @@ class CalculationsViewExtendedTest(TestCase):
         json_data = response.json()
 
         self.assertEqual(json_data['algorithm'], 'gradient')
-        self.assertIn('e', json_data)
-        self.assertIn('f', json_data)
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
 
         result = CalculationResult.objects.get(id=json_data['result_id'])
         self.assertEqual(result.algorithm, 'Метод градиентного спуска')
@@ -116,12 +122,26 @@ class CalculationsViewExtendedTest(TestCase):
         json_data = response.json()
 
         self.assertEqual(json_data['algorithm'], 'gradient_step')
-        self.assertIn('g', json_data)
-        self.assertIn('h', json_data)
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
 
         result = CalculationResult.objects.get(id=json_data['result_id'])
         self.assertEqual(result.algorithm, 'Метод градиентного спуска с переменным шагом')
 
+    def test_calculations_view_post_gradient_multistart(self):
+        """Тест POST запроса с градиентным спуском из нескольких стартов"""
+        response = self.client.post(reverse('calculations'), {'algorithm': 'gradient_multistart', 'tabledata': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'gradient_multistart')
+        self.assertEqual(json_data['stats']['n_starts'], 16)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод градиентного спуска из нескольких стартов')
+        self.assertEqual(result.stats['n_basins'], json_data['stats']['n_basins'])
+
     def test_calculations_view_post_otzhig(self):
         """Тест POST запроса с алгоритмом симуляции отжига"""
         data = {
@@ -134,11 +154,259 @@ class CalculationsViewExtendedTest(TestCase):
         json_data = response.json()
 
         self.assertEqual(json_data['algorithm'], 'otzhig')
-        self.assertIn('i', json_data)
-        self.assertIn('j', json_data)
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
 
         result = CalculationResult.objects.get(id=json_data['result_id'])
         self.assertEqual(result.algorithm, 'Метод симуляции отжига')
+        self.assertEqual(result.stats, json_data['stats'])
+        self.assertIn('acceptance_rate', result.stats)
+
+    def test_calculations_view_post_gauss_exact_step(self):
+        """Тест POST запроса с методом Гаусса и точным шагом"""
+        data = {
+            'algorithm': 'gauss',
+            'tabledata': '1',
+            'exact_step': 'on'
+        }
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+        self.assertIn('a', json_data)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод Гаусса (точный шаг)')
+        self.assertLess(result.iterations, 100)
+
+    def test_calculations_view_post_marquardt(self):
+        """Тест POST запроса с методом Левенберга — Марквардта"""
+        data = {
+            'algorithm': 'marquardt',
+            'tabledata': '1'
+        }
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'marquardt')
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод Левенберга — Марквардта')
+
+    def test_calculations_view_post_otzhig_replica(self):
+        """Тест POST запроса с отжигом с обменом реплик"""
+        data = {
+            'algorithm': 'otzhig_replica',
+            'tabledata': '1'
+        }
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'otzhig_replica')
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод отжига с обменом реплик')
+
+    def test_calculations_view_post_evolution(self):
+        """Тест POST запроса с дифференциальной эволюцией"""
+        response = self.client.post(reverse('calculations'), {'algorithm': 'evolution', 'tabledata': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'evolution')
+        self.assertEqual(json_data['stats']['pop_size'], 20)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод дифференциальной эволюции')
+
+    def test_calculations_view_post_bfgs(self):
+        """Тест POST запроса с методом BFGS"""
+        response = self.client.post(reverse('calculations'), {'algorithm': 'bfgs', 'tabledata': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'bfgs')
+        self.assertGreater(json_data['gradient_evaluations'], 0)
+        self.assertLess(json_data['optimality_gap'], 1e-6)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод BFGS')
+        self.assertEqual(result.loss_evaluations, json_data['loss_evaluations'])
+        self.assertEqual(result.gradient_evaluations, json_data['gradient_evaluations'])
+        self.assertEqual(result.optimality_gap, json_data['optimality_gap'])
+        self.assertEqual(result.bootstrap, json_data['bootstrap'])
+        self.assertEqual(result.param_a_se, json_data['a_se'])
+        self.assertEqual(result.param_b_se, json_data['b_se'])
+        self.assertTrue(-1.0 < result.param_correlation < 1.0)
+        self.assertLess(result.bootstrap['a'][0], result.param_a)
+        self.assertGreater(result.bootstrap['a'][1], result.param_a)
+
+    def test_calculations_view_post_nelder_mead(self):
+        """Тест POST запроса с методом Нелдера — Мида"""
+        response = self.client.post(reverse('calculations'), {'algorithm': 'nelder_mead', 'tabledata': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'nelder_mead')
+        self.assertGreater(json_data['stats']['evaluations'], 0)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Метод Нелдера — Мида')
+
+    def test_calculations_view_post_analytic(self):
+        """Тест POST запроса с аналитическим решением"""
+        data = {
+            'algorithm': 'analytic',
+            'tabledata': '1'
+        }
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+
+        self.assertEqual(json_data['algorithm'], 'analytic')
+        self.assertIn('a', json_data)
+        self.assertIn('b', json_data)
+        self.assertEqual(json_data['iterations'], 1)
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.algorithm, 'Аналитическое решение (МНК)')
+        self.assertEqual(self.client.session['param_a'], json_data['a'])
+
+    def test_calculations_view_post_warm_start(self):
+        """Теплый старт от лучшего прошлого расчета по таблице"""
+        first = self.client.post(reverse('calculations'), {'algorithm': 'analytic', 'tabledata': '1'}).json()
+        self.assertIsNone(first['warm_start'])
+
+        data = {
+            'algorithm': 'gradient_step',
+            'tabledata': '1',
+            'warm_start': 'previous'
+        }
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+        self.assertEqual(json_data['warm_start']['source'], 'previous')
+        self.assertEqual(json_data['warm_start']['result_id'], first['result_id'])
+
+        result = CalculationResult.objects.get(id=json_data['result_id'])
+        self.assertEqual(result.warm_start, json_data['warm_start'])
+
+    def test_calculations_view_repeat_cached(self):
+        """Повторный расчет с теми же данными и настройками берется из кэша"""
+        fit_cache.clear()
+        data = {'algorithm': 'gauss_step', 'tabledata': '1'}
+        first = self.client.post(reverse('calculations'), data).json()
+        second = self.client.post(reverse('calculations'), data).json()
+
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual((second['a'], second['b']), (first['a'], first['b']))
+        self.assertNotEqual(second['result_id'], first['result_id'])
+
+    @override_settings(FIT_TIME_BUDGET=0.0)
+    def test_calculations_view_time_budget(self):
+        """По истечении бюджета времени возвращается лучшее найденное решение с пометкой"""
+        fit_cache.clear()
+        json_data = self.client.post(reverse('calculations'), {'algorithm': 'gauss', 'tabledata': '1'}).json()
+
+        self.assertTrue(json_data['truncated'])
+        self.assertFalse(json_data['cached'])
+        self.assertTrue(CalculationResult.objects.get(id=json_data['result_id']).truncated)
+
+    def test_calculations_view_compare(self):
+        """Режим сравнения сохраняет результат каждого метода и возвращает сводку"""
+        data = {'algorithm': 'compare', 'tabledata': '1'}
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.json()
+        self.assertEqual(json_data['algorithm'], 'compare')
+        self.assertEqual(len(json_data['comparison']), 5)
+        self.assertIn('wall_time', json_data)
+        self.assertEqual(CalculationResult.objects.filter(user=self.user).count(), 5)
+
+        best = next(row for row in json_data['comparison'] if row['algorithm'] == json_data['best'])
+        self.assertEqual(self.client.session['result_id'], best['result_id'])
+        for row in json_data['comparison']:
+            for key in ('label', 'a', 'b', 'iterations', 'exec_time', 'average_op', 'result_id'):
+                self.assertIn(key, row)
+
+    def test_calculations_view_background_job(self):
+        """Фоновый режим: сразу возвращается id задания, результат — через опрос"""
+        data = {'algorithm': 'gauss', 'tabledata': '1', 'exact_step': 'on', 'background': '1'}
+        response = self.client.post(reverse('calculations'), data)
+
+        self.assertEqual(response.status_code, 202)
+        json_data = response.json()
+        self.assertEqual(json_data['status'], 'pending')
+        self.assertFalse(CalculationResult.objects.exists())
+
+        status = self.client.get(json_data['status_url']).json()
+        self.assertEqual(status['status'], 'pending')
+
+        jobs.work(once=True)
+        status = self.client.get(json_data['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['algorithm'], 'gauss_exact')
+        self.assertIn('a', status)
+        self.assertEqual(self.client.session['result_id'], status['result_id'])
+        self.assertEqual(CalculationResult.objects.get(id=status['result_id']).algorithm, 'Метод Гаусса (точный шаг)')
+
+    def test_fit_job_events_stream(self):
+        """SSE-поток отдает прогресс и событие завершения"""
+        data = {'algorithm': 'gauss', 'tabledata': '1', 'background': '1'}
+        job_data = self.client.post(reverse('calculations'), data).json()
+        jobs.work(once=True)
+
+        response = self.client.get(job_data['events_url'])
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: progress', body)
+        self.assertTrue(body.rstrip().startswith('event: progress'))
+        self.assertIn('event: done', body)
+
+        job = FitJob.objects.get(id=job_data['job_id'])
+        self.assertEqual(job.progress['iteration'] + 1, job.result.iterations)
+
+    @override_settings(FIT_JOB_EVENTS_TIMEOUT=0.05)
+    def test_fit_job_events_lifetime(self):
+        """Поток выполняющегося задания отдает текущий прогресс и закрывается по истечении времени жизни"""
+        job = jobs.enqueue(self.user, self.table, 'gauss')
+        progress = {'iteration': 3, 'loss': 1.5, 'a': 1.0, 'b': 2.0}
+        FitJob.objects.filter(id=job.id).update(status='running', progress=progress)
+        events_url = reverse('fit_job_events', args=[job.id])
+
+        body = b''.join(self.client.get(events_url).streaming_content).decode()
+        events = [block for block in body.split('\n\n') if block.strip()]
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith('event: progress'))
+        self.assertEqual(json.loads(events[0].split('data: ', 1)[1]), progress)
+
+        # после переподключения — тот же прогресс, затем завершение
+        FitJob.objects.filter(id=job.id).update(status='done')
+        body = b''.join(self.client.get(events_url).streaming_content).decode()
+        events = [block for block in body.split('\n\n') if block.strip()]
+        self.assertEqual([block.split('\n', 1)[0] for block in events], ['event: progress', 'event: done'])
+
+    def test_fit_job_status_other_user(self):
+        """Чужое задание недоступно"""
+        other = User.objects.create_user(username='other', password='x')
+        job = jobs.enqueue(other, self.table, 'gauss')
+        response = self.client.get(reverse('fit_job_status', args=[job.id]))
+        self.assertEqual(response.status_code, 404)
 
     def test_calculations_session_storage(self):
         """Тест сохранения данных в сессии"""
@@ -1,7 +1,14 @@
 import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth.models import User
-from main.models import Point, Table, CalculationResult, Profile, Post, Comment
+from main import jobs
+from main.models import Point, Table, CalculationResult, FitJob, Profile, Post, Comment
 
 
 class PointModelTest(TestCase):
@@ -233,3 +240,84 @@ class CommentModelTest(TestCase):
         )
         comments = Comment.objects.all()
         self.assertEqual(comments[0], comment2)  # Новые комментарии первыми
+
+
+class FitJobQueueTest(TestCase):
+    """Тесты очереди расчетов FitJob"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(title="Test Table", temperature=298.15, author=self.user)
+        for x, y in [(0.1, 500), (0.3, 900), (0.5, 1100), (0.7, 900), (0.9, 300)]:
+            self.table.points.add(Point.objects.create(x_value=x, y_value=y))
+
+    def test_claim_order_and_exclusivity(self):
+        """Задания забираются по очереди и только одним обработчиком"""
+        first = jobs.enqueue(self.user, self.table, 'gauss')
+        second = jobs.enqueue(self.user, self.table, 'analytic')
+
+        claimed = jobs.claim_job('w1')
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.worker), ('running', 'w1'))
+        self.assertEqual(jobs.claim_job('w2').id, second.id)
+        self.assertIsNone(jobs.claim_job('w3'))
+
+    def test_claim_skip_locked_path(self):
+        """Ветка SELECT ... FOR UPDATE SKIP LOCKED"""
+        job = jobs.enqueue(self.user, self.table, 'gauss')
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', True):
+            claimed = jobs.claim_job('w1')
+            self.assertEqual(claimed.id, job.id)
+            self.assertIsNone(jobs.claim_job('w2'))
+        self.assertEqual(FitJob.objects.get(id=job.id).status, 'running')
+
+    def test_run_fit_workers_drains_queue(self):
+        """run_fit_workers --once выполняет все задания и сохраняет результаты"""
+        ids = [jobs.enqueue(self.user, self.table, key, warm=warm).id
+               for key, warm in (('gauss', None), ('gradient_step', 'analytic'))]
+        call_command('run_fit_workers', '--once', stdout=StringIO())
+
+        for job in FitJob.objects.filter(id__in=ids):
+            self.assertEqual(job.status, 'done')
+            self.assertEqual(job.response['result_id'], job.result_id)
+            self.assertEqual(job.result.user, self.user)
+            self.assertIsNotNone(job.finished_at)
+        self.assertEqual(FitJob.objects.get(id=ids[1]).result.warm_start['source'], 'analytic')
+
+    def test_reclaim_stale_running_jobs(self):
+        """Задание, брошенное обработчиком в running, возвращается в очередь и выполняется"""
+        job = jobs.enqueue(self.user, self.table, 'gauss')
+        jobs.claim_job('dead-worker')
+        self.assertEqual(jobs.reclaim_stale(stale_after=60), (0, 0))
+
+        FitJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(jobs.reclaim_stale(stale_after=60), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.started_at), ('pending', '', None))
+
+        jobs.work(once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('done', 2))
+
+    def test_reclaim_stale_gives_up(self):
+        """После MAX_ATTEMPTS захватов зависшее задание завершается с ошибкой"""
+        job = jobs.enqueue(self.user, self.table, 'gauss')
+        for _ in range(jobs.MAX_ATTEMPTS):
+            self.assertEqual(jobs.claim_job('dead-worker').id, job.id)
+            FitJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(hours=1))
+            jobs.reclaim_stale()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('не завершил', job.error)
+        self.assertIsNone(jobs.claim_job('w1'))
+
+    def test_failed_job(self):
+        """Задание без таблицы завершается с ошибкой"""
+        job = jobs.enqueue(self.user, self.table, 'gauss')
+        self.table.delete()
+        jobs.work(once=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('удалена', job.error)
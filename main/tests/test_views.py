@@ -482,6 +482,30 @@ class ProfileViewTest(TestCase):
         self.assertTemplateUsed(response, 'profile.html')
         self.assertIn('user', response.context)
 
+    def test_profile_algorithm_ranking(self):
+        """Рейтинг алгоритмов: сначала точные, затем по числу вычислений"""
+        def create(algorithm, loss_evaluations, gradient_evaluations, gap):
+            CalculationResult.objects.create(
+                user=self.user, algorithm=algorithm, param_a=1.0, param_b=1.0, exec_time=0.1,
+                loss_evaluations=loss_evaluations, gradient_evaluations=gradient_evaluations,
+                optimality_gap=gap,
+            )
+
+        create('Метод Гаусса', 400, 0, 1e-9)
+        create('Метод Гаусса', 600, 0, 1e-8)
+        create('Метод BFGS', 12, 10, 1e-12)
+        create('Метод отжига', 10, 0, 1e-2)
+        CalculationResult.objects.create(user=self.user, algorithm='Старый расчет', param_a=1.0, param_b=1.0)
+
+        response = self.client.get(reverse('profile'))
+
+        ranking = response.context['algorithm_ranking']
+        self.assertEqual([row['algorithm'] for row in ranking], ['Метод BFGS', 'Метод Гаусса', 'Метод отжига'])
+        self.assertEqual(ranking[1]['runs'], 2)
+        self.assertEqual(ranking[1]['evaluations'], 500)
+        self.assertFalse(ranking[2]['exact'])
+        self.assertContains(response, 'Рейтинг алгоритмов')
+
     def test_profile_creates_profile_object(self):
         """Автоматическое создание объекта Profile"""
         # Убеждаемся, что профиля нет
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+
+
+class Trace:
+    """
+    Компактная история сходимости решателя.
+
+    На каждой итерации записываются (iteration, loss, a, b, step) в заранее
+    выделенный numpy-массив из capacity строк. При переполнении каждая вторая
+    запись отбрасывается, а шаг прореживания удваивается, поэтому длина истории
+    ограничена capacity при любом числе итераций. Последняя запись хранится
+    всегда, чтобы история заканчивалась финальным состоянием.
+
+    callback(progress) — необязательный обработчик прогресса: вызывается со
+    словарем последней записи не чаще одного раза в interval секунд (часы
+    проверяются раз в CHECK_EVERY записей, чтобы не замедлять цикл решателя).
+
+    scale = (loss, a, b) — множители перевода записей в исходные единицы,
+    когда решатель работает с обезразмеренной задачей (FitProblem.scaled);
+    step остается в единицах решателя.
+    """
+
+    FIELDS = ('iteration', 'loss', 'a', 'b', 'step')
+    CHECK_EVERY = 16
+
+    def __init__(self, capacity=256, *, callback=None, interval=0.25):
+        self.capacity = max(2, int(capacity))
+        self.data = np.empty((self.capacity, len(self.FIELDS)))
+        self.size = 0
+        self.stride = 1
+        self.seen = 0
+        self.last = None
+        self.callback = callback
+        self.interval = interval
+        self.emitted = float('-inf')
+        self.scale = (1.0, 1.0, 1.0)
+
+    def record(self, loss, a, b, step=0.0):
+        """Запись одной итерации."""
+        i = self.seen
+        self.seen += 1
+        loss_scale, a_scale, b_scale = self.scale
+        self.last = (i, loss * loss_scale, a * a_scale, b * b_scale, step)
+        if self.callback is not None and not i % self.CHECK_EVERY:
+            now = time.monotonic()
+            if now - self.emitted >= self.interval:
+                self.emitted = now
+                self.callback(self.progress())
+        if i % self.stride:
+            return
+
+        if self.size == self.capacity:
+            # прореживание: оставляем каждую вторую запись
+            half = self.capacity // 2
+            self.data[:half] = self.data[0:self.capacity:2][:half]
+            self.size = half
+            self.stride *= 2
+            if i % self.stride:
+                return
+
+        self.data[self.size] = self.last
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # обработчик прогресса не сериализуется (кэш результатов, пул процессов)
+        state = self.__dict__.copy()
+        state['callback'] = None
+        return state
+
+    def progress(self):
+        """Последняя запись в виде словаря (для отображения прогресса)."""
+        if self.last is None:
+            return None
+        i, loss, a, b, step = self.last
+        return {'iteration': int(i), 'loss': float(loss), 'a': float(a), 'b': float(b), 'step': float(step)}
+
+    def to_dict(self):
+        """История в виде словаря списков (для JSON)."""
+        rows = self.data[:self.size]
+        if self.last is not None and (self.size == 0 or rows[-1, 0] != self.last[0]):
+            rows = np.vstack((rows, self.last))
+        result = {name: [float(v) for v in rows[:, k]] for k, name in enumerate(self.FIELDS)}
+        result['iteration'] = [int(v) for v in result['iteration']]
+        return result
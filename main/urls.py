@@ -10,6 +10,8 @@ from main.views import (
     databases,
     graph_view,
     calculations,
+    fit_job_status,
+    fit_job_events,
     create_table,
     delete_table,
     profile,
@@ -37,6 +39,8 @@ urlpatterns = [
     path('profile/delete_result/<int:result_id>/', delete_result, name='delete_result'),
     path('graphs/', graph_view, name='graphs'),
     path('calculations/', calculations, name='calculations'),
+    path('calculations/jobs/<int:job_id>/', fit_job_status, name='fit_job_status'),
+    path('calculations/jobs/<int:job_id>/events/', fit_job_events, name='fit_job_events'),
     path('create-table/', create_table, name='create_table'),
     path('delete-table/<int:pk>/', delete_table, name='delete_table'),
     path('forum/', forum_list, name='forum_list'),
@@ -6,11 +6,13 @@ import json
 import math
 import traceback
 from datetime import time
+from time import perf_counter
 
 import numpy as np
 import matplotlib.pyplot as plt
 from io import BytesIO
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -18,11 +20,13 @@ from django.db.models.expressions import result
 from django.db.models import Q
 from django.http import HttpResponseRedirect
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import login, logout, authenticate
 from .forms import RegisterForm, LoginForm, GraphForm, UserUpdateForm, ProfileUpdateForm, PostForm
-from .models import Point, Table, CalculationResult, Profile, Post
-from django.http import JsonResponse
-from . import gauss, gauss_step, gradient, gradient_step, otzhig
+from .models import Point, Table, CalculationResult, FitJob, Profile, Post
+from .trace import Trace
+from django.http import JsonResponse, StreamingHttpResponse
+from . import compare, jobs, solvers
 from .forms import LoginForm
 param_a, param_b = 0, 0
 
@@ -500,7 +504,8 @@ def profile(request):
         'user': request.user,
         'user_form': user_form,
         'profile_form': profile_form,
-        'user_results': user_results
+        'user_results': user_results,
+        'algorithm_ranking': compare.rank_algorithms(user_results),
     })
     return render(request, 'profile.html', context)
 
@@ -556,194 +561,63 @@ def calculations(request):
             algorithm = request.POST.get('algorithm')
             table_id = int(request.POST.get('tabledata')) - 1
             table = tables[table_id]  # Получаем объект Table
-            response_data = {
-                'algorithm': algorithm,
-                'iterations': 'N/A',
-                'exec_time': 'N/A',
-                'table_data': []
-            }
-
-            # Логика для каждого алгоритма
-            if algorithm == 'gauss':
-                gauss_a, gauss_b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = gauss.gauss(
-                    tables, table_id)
-                table_data = [
-                    {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
-                    for x2, gmod, gexp, op, ap in zip(l_x2, l_gmod, l_gexp, l_op, l_ap)
-                ]
-
-                result = CalculationResult.objects.create(
-                    user=request.user,
-                    title=table.title,
-                    algorithm='Метод Гаусса',
-                    param_a=gauss_a,
-                    param_b=gauss_b,
-                    table=table,  # Передаем объект Table
-                    iterations=iterations or 0,
-                    average_op=avg_op,
-                    exec_time=exec_time,
-                    table_data=json.dumps(table_data)  # Сериализуем в JSON
-                )
-
-                response_data.update({
-                    'a': round(gauss_a, 3),
-                    'b': round(gauss_b, 3),
-                    'iterations': iterations or 'N/A',
-                    'exec_time': f"{exec_time:.3f} сек" if exec_time else 'N/A',
-                    'table_data': table_data,
-                    'result_id': result.id
-                })
-
-                context.update({
-                    'result': result,  # Передаем результат в шаблон
-                    'table_data': table_data  # Передаем данные таблицы в шаблон
-                })
-
-            elif algorithm == 'gauss_step':
-                gauss_step_a, gauss_step_b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = gauss_step.gauss_step(
-                    tables, table_id)
-                table_data = [
-                    {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
-                    for x2, gmod, gexp, op, ap in zip(l_x2, l_gmod, l_gexp, l_op, l_ap)
-                ]
-
-                result = CalculationResult.objects.create(
-                    user=request.user,
-                    title=table.title,
-                    algorithm='Метод Гаусса с переменным шагом',
-                    param_a=gauss_step_a,
-                    param_b=gauss_step_b,
-                    table=table,  # Передаем объект Table
-                    iterations=iterations or 0,
-                    average_op=avg_op,
-                    exec_time=exec_time,
-                    table_data=json.dumps(table_data)  # Сериализуем в JSON
-                )
-
-                response_data.update({
-                    'c': round(gauss_step_a, 3),
-                    'd': round(gauss_step_b, 3),
-                    'iterations': iterations or 'N/A',
-                    'exec_time': f"{exec_time:.3f} сек" if exec_time else 'N/A',
-                    'table_data': table_data,
-                    'result_id': result.id
-                })
-
-                context.update({
-                    'result': result,  # Передаем результат в шаблон
-                    'table_data': table_data  # Передаем данные таблицы в шаблон
-                })
-
-            elif algorithm == 'gradient':
-                gradient_a, gradient_b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = gradient.gradient(
-                    tables, table_id)
-                table_data = [
-                    {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
-                    for x2, gmod, gexp, op, ap in zip(l_x2, l_gmod, l_gexp, l_op, l_ap)
-                ]
-
-                result = CalculationResult.objects.create(
-                    user=request.user,
-                    title=table.title,
-                    algorithm='Метод градиентного спуска',
-                    param_a=gradient_a,
-                    param_b=gradient_b,
-                    table=table,  # Передаем объект Table
-                    iterations=iterations or 0,
-                    average_op=avg_op,
-                    exec_time=exec_time,
-                    table_data=json.dumps(table_data)  # Сериализуем в JSON
-                )
-
-                response_data.update({
-                    'e': round(gradient_a, 3),
-                    'f': round(gradient_b, 3),
-                    'iterations': iterations or 'N/A',
-                    'exec_time': f"{exec_time:.3f} сек" if exec_time else 'N/A',
-                    'table_data': table_data,
-                    'result_id': result.id
-                })
-
-                context.update({
-                    'result': result,  # Передаем результат в шаблон
-                    'table_data': table_data  # Передаем данные таблицы в шаблон
-                })
-
-            elif algorithm == 'gradient_step':
-                gradient_step_a, gradient_step_b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = gradient_step.gradient_step(
-                    tables, table_id)
-                table_data = [
-                    {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
-                    for x2, gmod, gexp, op, ap in zip(l_x2, l_gmod, l_gexp, l_op, l_ap)
-                ]
-
-                result = CalculationResult.objects.create(
-                    user=request.user,
-                    title=table.title,
-                    algorithm='Метод градиентного спуска с переменным шагом',
-                    param_a=gradient_step_a,
-                    param_b=gradient_step_b,
-                    table=table,  # Передаем объект Table
-                    iterations=iterations or 0,
-                    average_op=avg_op,
-                    exec_time=exec_time,
-                    table_data=json.dumps(table_data)  # Сериализуем в JSON
-                )
-
-                response_data.update({
-                    'g': round(gradient_step_a, 3),
-                    'h': round(gradient_step_b, 3),
-                    'iterations': iterations or 'N/A',
-                    'exec_time': f"{exec_time:.3f} сек" if exec_time else 'N/A',
-                    'table_data': table_data,
-                    'result_id': result.id
-                })
-
-                context.update({
-                    'result': result,  # Передаем результат в шаблон
-                    'table_data': table_data  # Передаем данные таблицы в шаблон
-                })
 
-            elif algorithm == 'otzhig':
-                otzhig_a, otzhig_b, iterations, exec_time, l_x2, l_gmod, l_gexp, l_op, l_ap, avg_op = otzhig.otzhig(
-                    tables, table_id)
-                table_data = [
-                    {'x2': float(x2), 'gmod': float(gmod), 'gexp': float(gexp), 'sigma': float(op), 'delta': float(ap)}
-                    for x2, gmod, gexp, op, ap in zip(l_x2, l_gmod, l_gexp, l_op, l_ap)
-                ]
-
-                result = CalculationResult.objects.create(
-                    user=request.user,
-                    title=table.title,
-                    algorithm='Метод симуляции отжига',
-                    param_a=otzhig_a,
-                    param_b=otzhig_b,
-                    table=table,  # Передаем объект Table
-                    iterations=iterations or 0,
-                    average_op=avg_op,
-                    exec_time=exec_time,
-                    table_data=json.dumps(table_data)  # Сериализуем в JSON
-                )
-
-                response_data.update({
-                    'i': round(otzhig_a, 3),
-                    'j': round(otzhig_b, 3),
-                    'iterations': iterations or 'N/A',
-                    'exec_time': f"{exec_time:.3f} сек" if exec_time else 'N/A',
-                    'table_data': table_data,
-                    'result_id': result.id
+            # Сравнение всех методов: параллельный запуск и сводная таблица
+            if algorithm == 'compare':
+                start_time = perf_counter()
+                results = compare.compare_all(table, time_budget=settings.FIT_TIME_BUDGET,
+                                              bootstrap=settings.FIT_BOOTSTRAP_RESAMPLES)
+                summary = compare.save_all(results, user=request.user, table=table)
+                best = min(summary, key=lambda row: row['average_op'])
+
+                request.session['param_a'] = best['a']
+                request.session['param_b'] = best['b']
+                request.session['result_id'] = best['result_id']
+                request.session['table_choice'] = table_id
+                request.session.modified = True
+
+                return JsonResponse({
+                    'algorithm': algorithm,
+                    'comparison': summary,
+                    'best': best['algorithm'],
+                    'wall_time': f"{perf_counter() - start_time:.3f} сек",
                 })
 
-                context.update({
-                    'result': result,  # Передаем результат в шаблон
-                    'table_data': table_data  # Передаем данные таблицы в шаблон
-                })
+            # Выбор алгоритма из реестра (вариант с точным шагом, если он есть)
+            spec = solvers.get_solver(algorithm)
+            if request.POST.get('exact_step') in ('on', 'true', '1'):
+                spec = solvers.SOLVERS.get(f'{algorithm}_exact', spec)
+
+            warm = request.POST.get('warm_start') or None
+
+            # Фоновый режим: задание в очередь (manage.py run_fit_workers), страница опрашивает статус
+            if request.POST.get('background') in ('on', 'true', '1'):
+                job = jobs.enqueue(request.user, table, spec.key, warm=warm)
+                request.session['table_choice'] = table_id
+                return JsonResponse({
+                    'algorithm': algorithm,
+                    'job_id': job.id,
+                    'status': job.status,
+                    'status_url': reverse('fit_job_status', args=[job.id]),
+                    'events_url': reverse('fit_job_events', args=[job.id]),
+                }, status=202)
+
+            solver_result = solvers.run_solver(spec, tables, table_id, warm=warm, trace=Trace(),
+                                               time_budget=settings.FIT_TIME_BUDGET,
+                                               bootstrap=settings.FIT_BOOTSTRAP_RESAMPLES)
+            result, payload = solvers.save_result(spec, solver_result, user=request.user, table=table)
+
+            response_data = {'algorithm': algorithm}
+            response_data.update(payload)
+
+            context.update({
+                'result': result,  # Передаем результат в шаблон
+                'table_data': payload['table_data']  # Передаем данные таблицы в шаблон
+            })
 
             # Сохранение в сессии
-            request.session['param_a'] = response_data.get('a') or response_data.get(
-                'c') or response_data.get('e') or response_data.get('g') or response_data.get('i')
-            request.session['param_b'] = response_data.get('b') or response_data.get(
-                'd') or response_data.get('f') or response_data.get('h') or response_data.get('j')
+            request.session['param_a'] = payload['a']
+            request.session['param_b'] = payload['b']
             request.session['result_id'] = result.id
             request.session['table_choice'] = table_id
             request.session.modified = True
@@ -761,6 +635,35 @@ def calculations(request):
     return render(request, 'calculations.html', context)
 
 
+@login_required
+def fit_job_status(request, job_id):
+    """Состояние задания из очереди; по готовности — тот же JSON, что и у синхронного расчета."""
+    job = get_object_or_404(FitJob, id=job_id, user=request.user)
+    data = {'job_id': job.id, 'status': job.status}
+
+    if job.status == 'done':
+        data.update(job.response)
+        request.session['param_a'] = job.response['a']
+        request.session['param_b'] = job.response['b']
+        request.session['result_id'] = job.response['result_id']
+        request.session.modified = True
+    elif job.status == 'failed':
+        data['error'] = f'Расчет завершился с ошибкой: {job.error}'
+
+    return JsonResponse(data)
+
+
+@login_required
+def fit_job_events(request, job_id):
+    """Прогресс задания в виде Server-Sent Events (см. jobs.job_events)."""
+    job = get_object_or_404(FitJob, id=job_id, user=request.user)
+    response = StreamingHttpResponse(jobs.job_events(job.id, timeout=settings.FIT_JOB_EVENTS_TIMEOUT),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def home_page(request):
     return render(request, 'index.html')
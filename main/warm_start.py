@@ -0,0 +1,46 @@
+import numpy as np
+
+WARM_START_SOURCES = ('previous', 'analytic')
+
+
+def best_previous(table, problem):
+    """
+    Лучшие сохраненные (a, b) для таблицы: среди всех CalculationResult по ней
+    выбирается пара с минимальной MSE на текущих точках таблицы.
+    Возвращает (result_id, a, b, loss) или None, если расчетов нет.
+    """
+    from .models import CalculationResult
+
+    rows = list(CalculationResult.objects.filter(table=table).values_list('id', 'param_a', 'param_b'))
+    if not rows:
+        return None
+
+    params = np.array([(a, b) for _, a, b in rows], dtype=float)
+    losses = problem.batch_mse(params)
+    losses[~np.isfinite(losses)] = np.inf
+    i = int(np.argmin(losses))
+    if not np.isfinite(losses[i]):
+        return None
+    return rows[i][0], float(params[i, 0]), float(params[i, 1]), float(losses[i])
+
+
+def warm_start(table, problem, source='previous'):
+    """
+    Начальное приближение для решателя.
+    source='previous' — лучший прошлый расчет по этой таблице (если расчетов нет —
+    аналитическая оценка), 'analytic' — МНК-оценка problem.optimum().
+    Возвращает (initial_params, seed), где seed — словарь с источником и
+    стартовыми a, b для сохранения вместе с результатом.
+    """
+    if source not in WARM_START_SOURCES:
+        raise ValueError(f"Неизвестный источник начального приближения: {source}")
+
+    if source == 'previous':
+        previous = best_previous(table, problem)
+        if previous is not None:
+            result_id, a, b, loss = previous
+            return (a, b), {'source': 'previous', 'result_id': result_id, 'a': a, 'b': b, 'loss': loss}
+
+    a, b = problem.optimum()
+    a, b = float(a), float(b)
+    return (a, b), {'source': 'analytic', 'result_id': None, 'a': a, 'b': b, 'loss': float(problem.mse(a, b))}
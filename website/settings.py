@@ -70,6 +70,39 @@ DATABASES = {
     }
 }
 
+# ===== Кэш =====
+# "fits" — результаты расчетов по хэшу данных и настроек (main/fit_cache.py).
+# LocMemCache вытесняет давно не использованные записи; CULL_FREQUENCY = MAX_ENTRIES
+# означает, что при переполнении удаляется одна запись.
+FIT_CACHE_SIZE = int(os.getenv('FIT_CACHE_SIZE', '512'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fits': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fit-results',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': FIT_CACHE_SIZE,
+            'CULL_FREQUENCY': FIT_CACHE_SIZE,
+        },
+    },
+}
+
+# ===== Расчеты =====
+# Бюджет времени (сек) одного расчета итерационным методом; по истечении
+# возвращается лучшее найденное решение с пометкой truncated. 0 — без ограничения.
+FIT_TIME_BUDGET = float(os.getenv('FIT_TIME_BUDGET', '30')) or None
+# Число бутстреп-выборок для доверительных интервалов a и b. 0 — не считать.
+FIT_BOOTSTRAP_RESAMPLES = int(os.getenv('FIT_BOOTSTRAP_RESAMPLES', '1000'))
+# Задание, которое выполняется дольше (сек), считается брошенным обработчиком
+# (процесс завершился) и возвращается в очередь (см. jobs.reclaim_stale).
+FIT_JOB_STALE_AFTER = float(os.getenv('FIT_JOB_STALE_AFTER', '600'))
+# Время жизни (сек) SSE-потока прогресса задания: поток занимает поток воркера,
+# поэтому закрывается, а EventSource переподключается (см. jobs.job_events).
+FIT_JOB_EVENTS_TIMEOUT = float(os.getenv('FIT_JOB_EVENTS_TIMEOUT', '30'))
+
 # ===== Cloudinary =====
 
 BASE_DIR = Path(__file__).resolve().parent.parent